@@ -8,6 +8,9 @@ from ._common import *
 from ._constant import *
 from ._tuple import *
 from ._enum import *
+from ._array import *
+from ._json_codec import *
+from ._containers import *
 
 
 __all__ = [
@@ -18,14 +21,17 @@ __all__ = [
         'Flag', 'IntFlag', 'enum_property',
         'AddValue', 'MagicValue', 'MultiValue', 'NoAlias', 'Unique',
         'AddValueEnum', 'MultiValueEnum', 'NoAliasEnum',
-        'enum', 'extend_enum', 'unique', 'property',
-        'NamedTuple', 'SqliteEnum', '_reduce_ex_by_name',
+        'enum', 'extend_enum', 'extend_enum_many', 'unique', 'property',
+        'NamedTuple', 'NamedTupleTable', 'SqliteEnum', '_reduce_ex_by_name', 'pickle_by_definition',
         'FlagBoundary', 'STRICT', 'CONFORM', 'EJECT', 'KEEP',
-        'add_stdlib_integration', 'remove_stdlib_integration'
+        'add_stdlib_integration', 'remove_stdlib_integration',
+        'register_value_key', 'register_sqlite', 'EnumArray', 'FlagArray',
+        'EnumJSONEncoder', 'EnumJSONDecoder', 'EnumSet', 'EnumMap',
         ]
 
 if sqlite3 is None:
     __all__.remove('SqliteEnum')
+    __all__.remove('register_sqlite')
 
 
 if PY2:
@@ -0,0 +1,497 @@
+from ._common import *
+from ._enum import STRICT, CONFORM, EJECT, KEEP
+
+__all__ = [
+        'EnumArray', 'FlagArray',
+        ]
+
+# NumPy is only imported when the first array is created, so that importing
+# aenum stays cheap for everyone else
+
+numpy = None
+
+def _import_numpy():
+    global numpy
+    if numpy is None:
+        import numpy
+
+
+# EnumArray
+
+def _smallest_unsigned(largest):
+    """
+    return the smallest unsigned integer dtype that can hold largest
+    """
+    return numpy.min_scalar_type(max(largest, 0))
+
+def _column(items):
+    """
+    return items as a one-dimensional array, using objects if NumPy would
+    otherwise change them (e.g. [1, 'a'] becomes ['1', 'a'])
+    """
+    if isinstance(items, numpy.ndarray):
+        return items
+    items = list(items)
+    if len(set([type(i) for i in items])) == 1:
+        column = numpy.array(items)
+        if column.ndim == 1:
+            return column
+    column = numpy.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        column[i] = item
+    return column
+
+class EnumArray(object):
+    """
+    A compact column of members of one enumeration.
+
+    Members are stored in a NumPy array as their index in definition order
+    (the same as `_sort_order_`), using the smallest unsigned integer type
+    that fits the member count; they are only turned back into members when
+    asked for.  Aliases are stored as their canonical member.
+    """
+
+    def __init__(self, enum_class, members=()):
+        _import_numpy()
+        self.enum_class = enum_class
+        self._refresh()
+        if isinstance(members, EnumArray):
+            codes = self._encode(members)
+        else:
+            codes = numpy.array([self._code(m) for m in members], dtype=self._dtype)
+        self._codes = numpy.asarray(codes, dtype=self._dtype)
+
+    @classmethod
+    def from_codes(cls, enum_class, codes):
+        """
+        Create from an array of member indexes.
+        """
+        array = cls(enum_class)
+        codes = numpy.asarray(codes)
+        if codes.ndim != 1:
+            raise ValueError('codes must be one-dimensional, not %d-dimensional' % codes.ndim)
+        if len(codes) and (codes.min() < 0 or codes.max() >= len(array._members)):
+            raise ValueError('codes must be between 0 and %d' % (len(array._members) - 1, ))
+        array._codes = codes.astype(array._dtype)
+        return array
+
+    @classmethod
+    def from_values(cls, enum_class, values):
+        """
+        Create from member values; each distinct value is looked up once.
+        """
+        return cls._from_keys(enum_class, values, enum_class)
+
+    @classmethod
+    def from_names(cls, enum_class, names):
+        """
+        Create from member names; each distinct name is looked up once.
+        """
+        return cls._from_keys(enum_class, names, enum_class.__getitem__)
+
+    @classmethod
+    def _from_keys(cls, enum_class, keys, lookup):
+        array = cls(enum_class)
+        keys = _column(keys)
+        if keys.ndim != 1:
+            raise ValueError('expected a one-dimensional sequence, not %d-dimensional' % keys.ndim)
+        try:
+            distinct, inverse = numpy.unique(keys, return_inverse=True)
+        except TypeError:
+            # unorderable keys (e.g. mixed types) -- use a dict instead
+            found = {}
+            inverse = numpy.empty(len(keys), dtype=numpy.intp)
+            for i, key in enumerate(keys.tolist()):
+                inverse[i] = found.setdefault(key, len(found))
+            distinct = sorted(found, key=found.get)
+        else:
+            distinct = distinct.tolist()
+        codes = numpy.array(
+                [array._code(lookup(key)) for key in distinct],
+                dtype=array._dtype,
+                )
+        array._codes = codes[inverse.ravel()]
+        return array
+
+    def _refresh(self):
+        """
+        (re)build the member table; extend_enum() may have added members
+        """
+        enum_class = self.enum_class
+        self._members = [enum_class._member_map_[name] for name in enum_class._member_names_]
+        self._index = dict((name, i) for i, name in enumerate(enum_class._member_names_))
+        self._dtype = _smallest_unsigned(len(self._members) - 1)
+
+    def _code(self, member):
+        """
+        return the index of member, which must belong to this array's enumeration
+        """
+        if not isinstance(member, self.enum_class):
+            raise TypeError('%r is not a member of %r' % (member, self.enum_class))
+        index = self._index
+        if len(index) != len(self.enum_class._member_names_):
+            self._refresh()
+            index = self._index
+        try:
+            return index[member._name_]
+        except KeyError:
+            raise ValueError('%r is not a canonical member of %r' % (member, self.enum_class))
+
+    def _encode(self, other):
+        """
+        return member index(es) for a member, an EnumArray, or an iterable of members
+        """
+        if isinstance(other, EnumArray):
+            if other.enum_class is not self.enum_class:
+                raise TypeError('%r is not an array of %r' % (other, self.enum_class))
+            return other._codes
+        elif isinstance(other, self.enum_class):
+            return self._code(other)
+        return numpy.array([self._code(m) for m in other], dtype=self._dtype)
+
+    def _table(self):
+        """
+        return the members, in index order
+        """
+        if len(self._members) != len(self.enum_class._member_names_):
+            self._refresh()
+        return self._members
+
+    @property
+    def codes(self):
+        """
+        the member indexes (read-only)
+        """
+        codes = self._codes.view()
+        codes.flags.writeable = False
+        return codes
+
+    @property
+    def dtype(self):
+        return self._codes.dtype
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __iter__(self):
+        members = self._table()
+        for code in self._codes.tolist():
+            yield members[code]
+
+    def __getitem__(self, key):
+        if isinstance(key, baseinteger) or isinstance(key, numpy.integer):
+            return self._table()[self._codes[key]]
+        array = self.__class__(self.enum_class)
+        array._codes = self._codes[key]
+        return array
+
+    def __setitem__(self, key, value):
+        codes = self._encode(value)
+        if self._dtype.itemsize > self._codes.dtype.itemsize:
+            # members were added and the indexes no longer fit
+            self._codes = self._codes.astype(self._dtype)
+        self._codes[key] = codes
+
+    def __eq__(self, other):
+        if isinstance(other, EnumArray) and other.enum_class is self.enum_class:
+            return self._codes == other._codes
+        elif isinstance(other, self.enum_class):
+            return self._codes == self._code(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return ~result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s, [%s])' % (
+                self.__class__.__name__,
+                self.enum_class.__name__,
+                ', '.join([repr(m) for m in self]),
+                )
+
+    def isin(self, members):
+        """
+        Return a boolean array, True where the member is one of members.
+        """
+        return numpy.isin(self._codes, [self._code(m) for m in members])
+
+    def names(self):
+        """
+        Return a NumPy array of the member names.
+        """
+        return _column([m._name_ for m in self._table()])[self._codes]
+
+    def values(self):
+        """
+        Return a NumPy array of the member values.
+        """
+        return _column([m._value_ for m in self._table()])[self._codes]
+
+
+# FlagArray
+
+_INT64_MAX = 2 ** 63 - 1
+
+def _flag_work(flag_class, values):
+    """
+    return values as an array to compute with: int64 when the class' bits
+    (and the values) fit, Python ints otherwise
+    """
+    if not isinstance(values, numpy.ndarray):
+        values = numpy.array(list(values), dtype=object)
+    if values.dtype.kind not in 'iuO':
+        raise TypeError('%r: flag values must be integers, not %s' % (flag_class, values.dtype))
+    if (
+            flag_class._all_bits_.bit_length() < 63
+            and not (values.dtype == numpy.uint64 and len(values) and values.max() > _INT64_MAX)
+        ):
+        try:
+            return values.astype(numpy.int64)
+        except OverflowError:
+            pass
+    return values.astype(object)
+
+def _flag_dtype(flag_class, values):
+    """
+    return the smallest integer dtype for the class' bits and values
+    """
+    largest = flag_class._all_bits_
+    smallest = 0
+    if len(values):
+        largest = max(largest, int(values.max()))
+        smallest = min(smallest, int(values.min()))
+    if smallest < 0:
+        return numpy.min_scalar_type(-max(largest + 1, -smallest))
+    return numpy.min_scalar_type(largest)
+
+def _apply_boundary(flag_class, values):
+    """
+    return values, and which were ejected (or None), after applying the
+    class' _boundary_ the way _create_pseudo_member_ does for one value
+    """
+    flag_mask = flag_class._flag_mask_
+    all_bits = flag_class._all_bits_
+    boundary = flag_class._boundary_
+    ejected = None
+    negative = values < 0
+    if boundary is CONFORM:
+        values = values & flag_mask
+    elif boundary is KEEP:
+        in_range = values >= ~all_bits
+        values = numpy.where(negative & in_range, values & flag_mask, values)
+        for i in numpy.nonzero(negative & ~in_range)[0]:
+            value = int(values[i])
+            values[i] = value & (2 ** value.bit_length() - 1)
+    elif boundary in (STRICT, EJECT):
+        outside = (values < ~all_bits) | (values > all_bits)
+        adjusted = numpy.where(negative & ~outside, values & flag_mask, values)
+        invalid = outside | ((adjusted & (all_bits ^ flag_mask)) != 0)
+        if boundary is STRICT:
+            if invalid.any():
+                # let the class report it
+                flag_class(int(values[numpy.argmax(invalid)]))
+            values = adjusted
+        else:
+            ejected = invalid
+            values = numpy.where(invalid, values, adjusted)
+    else:
+        raise ValueError('%r unknown flag boundary %r' % (flag_class, boundary))
+    return values, ejected
+
+class FlagArray(object):
+    """
+    A column of values of one Flag class, kept as raw bit masks.
+
+    The masks are stored in the smallest integer type that holds the class'
+    bits, combined with whole-array operations, and only turned into
+    members (or names) when asked for.  The class' _boundary_ is applied to
+    every new array; with EJECT, values that lose flag status are kept as
+    they are and marked in `ejected`.
+    """
+
+    def __init__(self, flag_class, values=()):
+        _import_numpy()
+        if isinstance(values, FlagArray):
+            if values.flag_class is not flag_class:
+                raise TypeError('%r is not an array of %r' % (values, flag_class))
+            work = values._work()
+        elif isinstance(values, numpy.ndarray):
+            work = _flag_work(flag_class, values)
+        else:
+            work = _flag_work(flag_class, [self._raw(flag_class, v) for v in values])
+        self._set(flag_class, work)
+
+    @classmethod
+    def _from_work(cls, flag_class, work):
+        array = cls.__new__(cls)
+        array._set(flag_class, work)
+        return array
+
+    def _set(self, flag_class, work):
+        self.flag_class = flag_class
+        work, self._ejected = _apply_boundary(flag_class, work)
+        self._masks = work.astype(_flag_dtype(flag_class, work))
+
+    @staticmethod
+    def _raw(flag_class, value):
+        """
+        return the integer value of a member (or integer)
+        """
+        if isinstance(value, flag_class):
+            return value._value_
+        elif isinstance(value, baseinteger) and not isinstance(value, bool):
+            return value
+        raise TypeError('%r is not a member of %r' % (value, flag_class))
+
+    def _work(self):
+        return _flag_work(self.flag_class, self._masks)
+
+    def _operand(self, other):
+        """
+        return other as an integer or array to combine with, or NotImplemented
+        """
+        flag_class = self.flag_class
+        if isinstance(other, FlagArray):
+            if other.flag_class is flag_class:
+                return other._work()
+        elif isinstance(other, flag_class):
+            return other._value_
+        elif issubclass(flag_class, int):
+            # like IntFlag members, arrays of them combine with integers
+            if isinstance(other, numpy.ndarray):
+                return _flag_work(flag_class, other)
+            elif isinstance(other, baseinteger):
+                return other
+        return NotImplemented
+
+    def _mask(self, flags):
+        """
+        return the combined value of a member, or an iterable of members
+        """
+        if isinstance(flags, self.flag_class):
+            return flags._value_
+        mask = 0
+        for flag in flags:
+            mask |= self._raw(self.flag_class, flag)
+        return mask
+
+    @property
+    def masks(self):
+        """
+        the raw masks (read-only)
+        """
+        masks = self._masks.view()
+        masks.flags.writeable = False
+        return masks
+
+    @property
+    def ejected(self):
+        """
+        with the EJECT boundary, True where the value is not a flag; otherwise None
+        """
+        return self._ejected
+
+    @property
+    def dtype(self):
+        return self._masks.dtype
+
+    def _decode(self, index):
+        value = int(self._masks[index])
+        if self._ejected is not None and self._ejected[index]:
+            return value
+        return self.flag_class(value)
+
+    def __len__(self):
+        return len(self._masks)
+
+    def __iter__(self):
+        for i in range(len(self._masks)):
+            yield self._decode(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, baseinteger) or isinstance(key, numpy.integer):
+            return self._decode(key)
+        array = self.__class__.__new__(self.__class__)
+        array.flag_class = self.flag_class
+        array._masks = self._masks[key]
+        array._ejected = None if self._ejected is None else self._ejected[key]
+        return array
+
+    def __or__(self, other):
+        other = self._operand(other)
+        if other is NotImplemented:
+            return other
+        return self._from_work(self.flag_class, self._work() | other)
+
+    def __and__(self, other):
+        other = self._operand(other)
+        if other is NotImplemented:
+            return other
+        return self._from_work(self.flag_class, self._work() & other)
+
+    def __xor__(self, other):
+        other = self._operand(other)
+        if other is NotImplemented:
+            return other
+        return self._from_work(self.flag_class, self._work() ^ other)
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __invert__(self):
+        return self._from_work(self.flag_class, ~self._work())
+
+    def __eq__(self, other):
+        other = self._operand(other)
+        if other is NotImplemented:
+            return other
+        return self._work() == other
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return ~result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s, [%s])' % (
+                self.__class__.__name__,
+                self.flag_class.__name__,
+                ', '.join([repr(m) for m in self]),
+                )
+
+    def has_any(self, flags):
+        """
+        Return a boolean array, True where any of flags is set.
+        """
+        return (self._work() & self._mask(flags)) != 0
+
+    def has_all(self, flags):
+        """
+        Return a boolean array, True where all of flags are set.
+        """
+        mask = self._mask(flags)
+        return (self._work() & mask) == mask
+
+    def names(self):
+        """
+        Return a NumPy array of the names; each distinct value is decoded once.
+        """
+        distinct, inverse = numpy.unique(self._masks, return_inverse=True)
+        names = {}
+        for i, value in enumerate(distinct.tolist()):
+            names[i] = self.flag_class(value)._name_
+        decoded = _column([names[i] for i in range(len(distinct))])
+        names = decoded[inverse.ravel()]
+        if self._ejected is not None:
+            names = names.astype(object)
+            names[self._ejected] = None
+        return names
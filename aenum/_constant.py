@@ -71,6 +71,8 @@ class NamedConstantMeta(type):
         newcls = super(NamedConstantMeta, metacls).__new__(metacls, cls, bases, newdict)
         newcls._named_constant_cache_ = {}
         newcls._members_ = {}
+        newcls._value2member_map_ = {}
+        newcls._value2member_seq_ = []
         for name, obj in constants.items():
             new_k = newcls.__new__(newcls, name, obj)
             newcls._members_[name] = new_k
@@ -115,11 +117,18 @@ def __new__(cls, name, value=None, doc=None):
     if value is None:
         # lookup, name is value
         value = name
-        for name, obj in cls.__dict__.items():
-            if isinstance(obj, cls) and obj._value_ == value:
-                return obj
-        else:
-            raise ValueError('%r does not exist in %r' % (value, cls.__name__))
+        try:
+            obj = cls._value2member_map_.get(value)
+        except TypeError:
+            obj = None
+        if obj is None:
+            # constants with unhashable values
+            for obj in cls._value2member_seq_:
+                if obj._value_ == value:
+                    break
+            else:
+                raise ValueError('%r does not exist in %r' % (value, cls.__name__))
+        return obj
     cur_obj = cls.__dict__.get(name)
     if isinstance(cur_obj, NamedConstant):
         raise AttributeError('cannot rebind constant <%s.%s>' % (cur_obj.__class__.__name__, cur_obj._name_))
@@ -140,6 +149,11 @@ def __new__(cls, name, value=None, doc=None):
     obj._value_ = value
     obj.__doc__ = doc
     cls._members_[name] = obj
+    try:
+        # the first constant with a value keeps it
+        cls._value2member_map_.setdefault(value, obj)
+    except TypeError:
+        cls._value2member_seq_.append(obj)
     metacls.__setattr__(cls, name, obj)
     return obj
 
@@ -152,6 +166,14 @@ def __repr__(self):
 def __reduce_ex__(self, proto):
     return getattr, (self.__class__, self._name_)
 
+@constant_dict
+def __copy__(self):
+    return self
+
+@constant_dict
+def __deepcopy__(self, memo):
+    return self
+
 NamedConstant = NamedConstantMeta('NamedConstant', (object, ), constant_dict.resolve())
 Constant = NamedConstant
 del constant_dict
@@ -0,0 +1,527 @@
+from ._common import *
+from ._enum import EnumType, Flag, bit_count, _high_bit
+
+try:
+    from collections.abc import Iterable, ItemsView, MutableMapping, MutableSet, ValuesView
+except ImportError:
+    # python 2
+    from collections import Iterable, ItemsView, MutableMapping, MutableSet, ValuesView
+
+__all__ = [
+        'EnumSet', 'EnumMap',
+        ]
+
+
+_new_object = object.__new__
+
+def _universe(enum_class):
+    """
+    return the canonical members of enum_class in definition order (so the
+    position of each is its _sort_order_); the list is kept in the class'
+    _universe_, shared by all its containers, and grows in place when
+    extend_enum() has added members
+    """
+    members = getattr(enum_class, '__dict__', {}).get('_universe_')
+    if members is None:
+        if not isinstance(enum_class, EnumType):
+            raise TypeError('%r is not an enumeration' % (enum_class, ))
+        members = []
+        type.__setattr__(enum_class, '_universe_', members)
+    names = enum_class._member_names_
+    if len(members) != len(names):
+        member_map = enum_class._member_map_
+        members[len(members):] = [member_map[name] for name in names[len(members):]]
+    return members
+
+
+class EnumSet(MutableSet):
+    """
+    A set of members of one enumeration, kept as an int with a bit set for
+    each member's position in definition order (its _sort_order_).
+
+    Iteration is in definition order.  Aliases are stored as their canonical
+    member; a Flag member that is not canonical (such as a combination of
+    other members) is stored as the canonical members it is made of.
+    """
+
+    __slots__ = ('enum_class', '_members', '_bits')
+
+    def __init__(self, enum_class, members=()):
+        self.enum_class = enum_class
+        self._members = _universe(enum_class)
+        self._bits = 0
+        if members:
+            self._bits = self._bits_of(members)
+
+    @classmethod
+    def from_int(cls, enum_class, bits):
+        """
+        Create from an int whose bit n is set for the member at position n.
+        """
+        enum_set = cls(enum_class)
+        if bits < 0 or bits >> len(enum_set._members):
+            raise ValueError('%r has bits set beyond the %d members of %r' % (
+                    bits, len(enum_set._members), enum_class,
+                    ))
+        enum_set._bits = bits
+        return enum_set
+
+    @classmethod
+    def all_of(cls, enum_class):
+        """
+        Create with every member of enum_class.
+        """
+        enum_set = cls(enum_class)
+        enum_set._bits = (1 << len(enum_set._members)) - 1
+        return enum_set
+
+    def _from_iterable(self, members):
+        # used by the Set mixin methods
+        return self.__class__(self.enum_class, members)
+
+    def _position(self, member):
+        """
+        return the bits for member, which must belong to this set's enumeration
+        """
+        members = self._members
+        try:
+            position = member._sort_order_
+            if members[position] is member:
+                return 1 << position
+        except (AttributeError, IndexError):
+            pass
+        enum_class = self.enum_class
+        if not isinstance(member, enum_class):
+            raise TypeError('%r is not a member of %r' % (member, enum_class))
+        # added by extend_enum(), or not canonical
+        members = _universe(enum_class)
+        position = getattr(member, '_sort_order_', None)
+        if position is not None and position < len(members) and members[position] is member:
+            return 1 << position
+        if issubclass(enum_class, Flag):
+            bits = 0
+            for canonical in member:
+                bits |= 1 << canonical._sort_order_
+            return bits
+        canonical = enum_class._member_map_.get(member._name_)
+        if canonical is not None and canonical is not member:
+            return self._position(canonical)
+        raise ValueError('%r is not a canonical member of %r' % (member, enum_class))
+
+    def _bits_of(self, other):
+        """
+        return the bits for an EnumSet of the same enumeration, or an
+        iterable of members
+        """
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return other._bits
+        position = self._position
+        bits = 0
+        for member in other:
+            bits |= position(member)
+        return bits
+
+    def _operand(self, other):
+        """
+        return the bits for other, or None if it cannot be used in set algebra
+        """
+        if isinstance(other, EnumSet):
+            if other.enum_class is self.enum_class:
+                return other._bits
+        elif isinstance(other, Iterable):
+            try:
+                return self._bits_of(other)
+            except (TypeError, ValueError):
+                pass
+        return None
+
+    def _new(self, bits):
+        enum_set = _new_object(self.__class__)
+        enum_set.enum_class = self.enum_class
+        enum_set._members = self._members
+        enum_set._bits = bits
+        return enum_set
+
+    def __int__(self):
+        return self._bits
+
+    def __contains__(self, member):
+        try:
+            position = member._sort_order_
+            if self._members[position] is member:
+                return self._bits >> position & 1 == 1
+        except (AttributeError, IndexError):
+            pass
+        try:
+            bits = self._position(member)
+        except (TypeError, ValueError):
+            return False
+        return bits != 0 and self._bits & bits == bits
+
+    def __iter__(self):
+        members = self._members
+        bits = self._bits
+        while bits:
+            lowest = bits & -bits
+            yield members[_high_bit(lowest)]
+            bits ^= lowest
+
+    def __len__(self):
+        return bit_count(self._bits)
+
+    def __bool__(self):
+        return self._bits != 0
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return '%s(%s, [%s])' % (
+                self.__class__.__name__,
+                self.enum_class.__name__,
+                ', '.join([repr(m) for m in self]),
+                )
+
+    def __reduce__(self):
+        return self.__class__, (self.enum_class, list(self))
+
+    def __copy__(self):
+        return self._new(self._bits)
+    copy = __copy__
+
+    __hash__ = None
+
+    def __eq__(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return self._bits == other._bits
+        return super(EnumSet, self).__eq__(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __le__(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return self._bits & other._bits == self._bits
+        return super(EnumSet, self).__le__(other)
+
+    def __lt__(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return self._bits != other._bits and self._bits & other._bits == self._bits
+        return super(EnumSet, self).__lt__(other)
+
+    def __ge__(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return self._bits & other._bits == other._bits
+        return super(EnumSet, self).__ge__(other)
+
+    def __gt__(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return self._bits != other._bits and self._bits & other._bits == other._bits
+        return super(EnumSet, self).__gt__(other)
+
+    def isdisjoint(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return not self._bits & other._bits
+        return super(EnumSet, self).isdisjoint(other)
+
+    def __or__(self, other):
+        if other.__class__ is self.__class__ and other.enum_class is self.enum_class:
+            return self._new(self._bits | other._bits)
+        bits = self._operand(other)
+        if bits is None:
+            return NotImplemented
+        return self._new(self._bits | bits)
+    __ror__ = __or__
+
+    def __and__(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return self._new(self._bits & other._bits)
+        if not isinstance(other, Iterable):
+            return NotImplemented
+        # non-members are simply not in the result
+        return self._new(self._bits & _bits_present(self, other))
+    __rand__ = __and__
+
+    def __sub__(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return self._new(self._bits & ~other._bits)
+        if not isinstance(other, Iterable):
+            return NotImplemented
+        return self._new(self._bits & ~_bits_present(self, other))
+
+    def __xor__(self, other):
+        if other.__class__ is self.__class__ and other.enum_class is self.enum_class:
+            return self._new(self._bits ^ other._bits)
+        bits = self._operand(other)
+        if bits is None:
+            return NotImplemented
+        return self._new(self._bits ^ bits)
+    __rxor__ = __xor__
+
+    def __invert__(self):
+        members = _universe(self.enum_class)
+        return self._new(~self._bits & ((1 << len(members)) - 1))
+
+    def __ior__(self, other):
+        self._bits |= self._bits_of(other)
+        return self
+
+    def __iand__(self, other):
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            self._bits &= other._bits
+        else:
+            self._bits &= _bits_present(self, other)
+        return self
+
+    def __isub__(self, other):
+        if other is self:
+            self._bits = 0
+        elif isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            self._bits &= ~other._bits
+        else:
+            self._bits &= ~_bits_present(self, other)
+        return self
+
+    def __ixor__(self, other):
+        self._bits ^= self._bits_of(other)
+        return self
+
+    def add(self, member):
+        self._bits |= self._position(member)
+
+    def discard(self, member):
+        try:
+            self._bits &= ~self._position(member)
+        except (TypeError, ValueError):
+            pass
+
+    def remove(self, member):
+        if member not in self:
+            raise KeyError(member)
+        self._bits &= ~self._position(member)
+
+    def clear(self):
+        self._bits = 0
+
+
+def _bits_present(enum_set, members):
+    """
+    return the bits for the members of enum_set's enumeration found in
+    members, ignoring anything else
+    """
+    position = enum_set._position
+    bits = 0
+    for member in members:
+        try:
+            bits |= position(member)
+        except (TypeError, ValueError):
+            pass
+    return bits
+
+
+# marks the slots of an EnumMap that have no value
+_empty = object()
+
+class EnumMap(MutableMapping):
+    """
+    A mapping keyed by the members of one enumeration, with the values kept
+    in a list at each member's position in definition order (its
+    _sort_order_).
+
+    Iteration is in definition order.  Aliases use their canonical member's
+    slot.  Flag keys must be single members: combined flags (named, like
+    RW = R | W, or not) have no slot of their own, and cannot be stored.
+    """
+
+    __slots__ = ('enum_class', '_members', '_values', '_len')
+
+    def __init__(self, enum_class, items=()):
+        self.enum_class = enum_class
+        self._members = _universe(enum_class)
+        self._values = [_empty] * len(self._members)
+        self._len = 0
+        if items:
+            self.update(items)
+
+    @classmethod
+    def fromkeys(cls, enum_class, keys=None, value=None):
+        """
+        Create with keys (all the members of enum_class by default) mapped
+        to value.
+        """
+        enum_map = cls(enum_class)
+        if keys is None:
+            enum_map._values = [value] * len(enum_map._members)
+            enum_map._len = len(enum_map._members)
+        else:
+            for key in keys:
+                enum_map[key] = value
+        return enum_map
+
+    def _position(self, key):
+        """
+        return the slot for key, growing the values if extend_enum() has added
+        members; raises KeyError if key is not a member of this map's enumeration
+        """
+        enum_class = self.enum_class
+        if not isinstance(key, enum_class):
+            raise KeyError(key)
+        members = _universe(enum_class)
+        values = self._values
+        if len(values) < len(members):
+            values.extend([_empty] * (len(members) - len(values)))
+        position = getattr(key, '_sort_order_', None)
+        if position is not None and position < len(members) and members[position] is key:
+            return position
+        canonical = enum_class._member_map_.get(key._name_)
+        if canonical is not None and canonical is not key:
+            return self._position(canonical)
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        try:
+            position = key._sort_order_
+            if self._members[position] is key:
+                value = self._values[position]
+                if value is _empty:
+                    raise KeyError(key)
+                return value
+        except (AttributeError, IndexError):
+            pass
+        value = self._values[self._position(key)]
+        if value is _empty:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            position = key._sort_order_
+            if self._members[position] is key:
+                value = self._values[position]
+                return default if value is _empty else value
+        except (AttributeError, IndexError):
+            pass
+        try:
+            value = self._values[self._position(key)]
+        except KeyError:
+            return default
+        return default if value is _empty else value
+
+    def __contains__(self, key):
+        try:
+            position = key._sort_order_
+            if self._members[position] is key:
+                return self._values[position] is not _empty
+        except (AttributeError, IndexError):
+            pass
+        try:
+            return self._values[self._position(key)] is not _empty
+        except KeyError:
+            return False
+
+    def __setitem__(self, key, value):
+        try:
+            position = key._sort_order_
+            if self._members[position] is key:
+                values = self._values
+                if values[position] is _empty:
+                    self._len += 1
+                values[position] = value
+                return
+        except (AttributeError, IndexError):
+            pass
+        try:
+            position = self._position(key)
+        except KeyError:
+            if isinstance(key, self.enum_class):
+                raise ValueError(
+                        '%r is not a single member of %r (combined flags have no slot of their own)'
+                        % (key, self.enum_class)
+                        )
+            raise TypeError('%r is not a member of %r' % (key, self.enum_class))
+        values = self._values
+        if values[position] is _empty:
+            self._len += 1
+        values[position] = value
+
+    def __delitem__(self, key):
+        self[key]
+        self._values[self._position(key)] = _empty
+        self._len -= 1
+
+    def __iter__(self):
+        return iter([
+                member
+                for member, value in zip(self._members, self._values)
+                if value is not _empty
+                ])
+
+    def __len__(self):
+        return self._len
+
+    def items(self):
+        return _EnumMapItems(self)
+
+    def values(self):
+        return _EnumMapValues(self)
+
+    def clear(self):
+        self._values = [_empty] * len(self._values)
+        self._len = 0
+
+    def copy(self):
+        enum_map = _new_object(self.__class__)
+        enum_map.enum_class = self.enum_class
+        enum_map._members = self._members
+        enum_map._values = self._values[:]
+        enum_map._len = self._len
+        return enum_map
+    __copy__ = copy
+
+    def __repr__(self):
+        return '%s(%s, {%s})' % (
+                self.__class__.__name__,
+                self.enum_class.__name__,
+                ', '.join(['%r: %r' % (k, v) for k, v in self.items()]),
+                )
+
+    def __reduce__(self):
+        return self.__class__, (self.enum_class, list(self.items()))
+
+    __hash__ = None
+
+    def __eq__(self, other):
+        if isinstance(other, EnumMap) and other.enum_class is self.enum_class:
+            if self._len != other._len:
+                return False
+            for mine, theirs in zip(self._values, other._values):
+                if mine is not theirs and mine != theirs:
+                    return False
+            return True
+        return super(EnumMap, self).__eq__(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+
+class _EnumMapItems(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        enum_map = self._mapping
+        return iter([
+                (member, value)
+                for member, value in zip(enum_map._members, enum_map._values)
+                if value is not _empty
+                ])
+
+
+class _EnumMapValues(ValuesView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter([value for value in self._mapping._values if value is not _empty])
@@ -1,21 +1,32 @@
 from __future__ import print_function
 from ._common import *
 from ._constant import NamedConstant
-from ._tuple import NamedTuple
-from collections import defaultdict
+from ._tuple import NamedTuple, NamedTupleMeta, TupleSize
+import hashlib
+from operator import attrgetter as _attrgetter
+import pickle
 import textwrap
 import sys as _sys
+import weakref
+from threading import Lock, RLock
+
+try:
+    import copyreg as _copyreg
+except ImportError:
+    # python 2
+    import copy_reg as _copyreg
 
 __all__ = [
         'bit_count', 'is_single_bit', 'bin', 'property', 'bits',
         'AddValue', 'MagicValue', 'MultiValue', 'NoAlias', 'Unique', 'enum', 'auto',
         'AddValueEnum', 'MultiValueEnum', 'NoAliasEnum', 'UniqueEnum', 'AutoNumberEnum',
-        'OrderedEnum', 'unique', 'no_arg', 'extend_enum', 'enum_property',
+        'OrderedEnum', 'unique', 'no_arg', 'extend_enum', 'extend_enum_many', 'enum_property',
         'EnumType', 'EnumMeta', 'EnumDict', 'Enum', 'IntEnum', 'StrEnum', 'Flag', 'IntFlag',
         'LowerStrEnum', 'UpperStrEnum', 'ReprEnum', 'SqliteEnum', 'sqlite3',
         'FlagBoundary', 'STRICT', 'CONFORM', 'EJECT', 'KEEP',
         'add_stdlib_integration', 'remove_stdlib_integration',
-        'export', 'cls2module', '_reduce_ex_by_name', 'show_flag_values',
+        'export', 'cls2module', '_reduce_ex_by_name', 'pickle_by_definition', 'show_flag_values',
+        'register_value_key', 'register_sqlite',
         ]
         
 
@@ -26,6 +37,7 @@ try:
 except ImportError:
     sqlite3 = None
     __all__.remove('SqliteEnum')
+    __all__.remove('register_sqlite')
 
 try:
     RecursionError
@@ -155,6 +167,12 @@ except ImportError:
     base = object
     DynamicClassAttribute = None
 
+try:
+    from types import MappingProxyType
+except ImportError:
+    # python 2
+    MappingProxyType = None
+
 def info(enum):
     """
     show details about given enum/flag
@@ -297,6 +315,68 @@ class property(base):
         self.name = name
         self.clsname = ownerclass.__name__
 
+class _member_attribute(bltin_property):
+    # name, value, and values: the builtin property's __get__ and an
+    # attrgetter read the attribute without running any Python code; on the
+    # class itself EnumType's _member_attribute_guard answers instead, and
+    # finds a member with the same name
+    def __init__(self, attr, doc=None):
+        name = attr[1:-1]
+        def fset(instance, value):
+            raise AttributeError(
+                    "cannot set attribute %r on <aenum %r>" % (name, instance.__class__.__name__)
+                    )
+        def fdel(instance):
+            raise AttributeError(
+                    "cannot delete attribute %r on <aenum %r>" % (name, instance.__class__.__name__)
+                    )
+        super(_member_attribute, self).__init__(_attrgetter(attr), fset, fdel, doc)
+        self.__doc__ = doc
+
+    def __repr__(self):
+        return '<member attribute %r>' % self.fget
+
+_member_attributes = ('name', 'value', 'values')
+
+class _member_attribute_guard(object):
+    """
+    EnumType's name, value, and values
+
+    A data descriptor on the metaclass is found before anything in the enum
+    class, so reading the attribute from the class comes here instead of to
+    the _member_attribute (a builtin property returns itself when read from
+    the class); it raises AttributeError, as the stdlib does, unless there is
+    a member or another attribute by that name.  Members with these names
+    are only kept in _member_map_, as this cannot store anything in the class.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, cls, metacls=None):
+        if cls is None:
+            return self
+        name = self.name
+        member = cls.__dict__.get('_member_map_', {}).get(name)
+        if member is not None:
+            return member
+        for base in cls.__mro__:
+            if name in base.__dict__:
+                attr = base.__dict__[name]
+                if isinstance(attr, _member_attribute):
+                    break
+                get = getattr(type(attr), '__get__', None)
+                if get is None:
+                    return attr
+                return get(attr, None, cls)
+        raise AttributeError('%r has no attribute %r' % (cls, name))
+
+    def __set__(self, cls, value):
+        raise AttributeError('%s: cannot rebind property %r' % (cls.__name__, self.name))
+
+    def __delete__(self, cls):
+        raise AttributeError('%s: cannot delete property %r' % (cls.__name__, self.name))
+
 _RouteClassAttributeToGetattr = property
 if DynamicClassAttribute is None:
     DynamicClassAttribute = property
@@ -366,6 +446,14 @@ def bit_count(num):
         count += 1
     return count
 
+if hasattr(int, 'bit_count'):
+    # Python 3.10+ counts them natively
+    def bit_count(num):
+        """
+        return number of set bits
+        """
+        return int.bit_count(num)
+
 def bit_len(num):
     length = 0
     while num:
@@ -410,6 +498,145 @@ def enumsort(things):
         except TypeError:
             return sorted(things, key=lambda i: i[0])
 
+# unhashable values
+#
+# values that cannot be stored in _value2member_map_ are kept in _value2member_seq_;
+# to avoid a linear search for them, a hashable key is calculated for each such value
+# and the (value, member) pairs are stored by that key in _value2member_idx_ -- values
+# with no known key are stored under None, and can only be found by searching
+
+def _key_from_sequence(value):
+    return tuple([_value_key(v) for v in value])
+
+def _key_from_mapping(value):
+    return frozenset([(k, _value_key(v)) for k, v in value.items()])
+
+_value_keys = {
+        list: _key_from_sequence,
+        tuple: _key_from_sequence,
+        dict: _key_from_mapping,
+        set: frozenset,
+        }
+
+def register_value_key(value_type, key):
+    """
+    Register `key` as the function that converts an unhashable value of
+    `value_type` into a hashable key for by-value lookups.
+
+    Values that compare equal must produce equal keys; values with equal keys
+    are still compared before being considered a match.
+    """
+    _value_keys[value_type] = key
+
+def _value_key(value):
+    """
+    return a hashable stand-in for value, or raise TypeError
+    """
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        pass
+    for base in type(value).__mro__:
+        key = _value_keys.get(base)
+        if key is not None:
+            return key(value)
+    raise TypeError('no value key registered for %r' % (type(value), ))
+
+def _add_unhashable(enum_class, value, member):
+    """
+    record an unhashable value in both the sequence and the index
+    """
+    enum_class._value2member_seq_.append((value, member))
+    index = getattr(enum_class, '_value2member_idx_', None)
+    if index is None:
+        # not an aenum enum
+        return
+    try:
+        key = _value_key(value)
+        hash(key)
+    except TypeError:
+        key = None
+    index.setdefault(key, []).append((value, member))
+
+def _find_unhashable(enum_class, value):
+    """
+    return the member whose unhashable value matches value, or None
+    """
+    index = getattr(enum_class, '_value2member_idx_', None)
+    try:
+        if index is None:
+            raise TypeError('no index')
+        # values with no key could still be equal, so check those as well
+        searches = index.get(_value_key(value), ()), index.get(None, ())
+    except TypeError:
+        # no key available, do it the long way
+        searches = getattr(enum_class, '_value2member_seq_', ()),
+    for candidates in searches:
+        for member_value, member in candidates:
+            if member_value == value:
+                return member
+    return None
+
+# dense integer values
+#
+# when all the values in _value2member_map_ are ints that (mostly) fill the
+# range from the smallest of them, _value2member_dense_ holds that smallest
+# value and a list indexed by value - smallest, so by-value lookups need neither
+# hashing nor exception handling; unused slots hold None
+
+def _update_dense_lookup(enum_class):
+    """
+    rebuild the dense lookup table from _value2member_map_ (if it is dense enough)
+    """
+    value_map = enum_class._value2member_map_
+    offset, slots = 0, []
+    if (
+            value_map
+            and NoAlias not in enum_class._settings_
+            and all(type(v) is int for v in value_map)
+        ):
+        offset = min(value_map)
+        size = max(value_map) - offset + 1
+        if size <= 2 * len(value_map) + 1:
+            slots = [None] * size
+            for value, member in value_map.items():
+                slots[value - offset] = member
+        else:
+            offset = 0
+    type.__setattr__(enum_class, '_value2member_dense_', (offset, slots))
+
+def _extend_dense_lookup(enum_class, member):
+    """
+    add member's values to the dense lookup table
+
+    Values inside the table's range, or a little past its end, are added in
+    place; anything else drops the table, which is only rebuilt when the
+    number of values reaches a power of two so that adding members one at a
+    time stays linear.
+    """
+    count = len(enum_class._value2member_map_)
+    offset, slots = enum_class._value2member_dense_
+    for value in getattr(member, '_values_', [member._value_]):
+        if not slots or type(value) is not int:
+            break
+        index = value - offset
+        if 0 <= index < len(slots):
+            if slots[index] is None:
+                slots[index] = member
+        elif len(slots) <= index < 2 * count + 1:
+            slots.extend([None] * (index - len(slots)))
+            slots.append(member)
+        else:
+            break
+    else:
+        if slots:
+            return
+    if count & (count - 1) == 0:
+        _update_dense_lookup(enum_class)
+    elif slots:
+        type.__setattr__(enum_class, '_value2member_dense_', (0, []))
+
 # Enum
 
     # _init_ and value and AddValue
@@ -755,15 +982,20 @@ class _proto_member:
     intermediate step for enum members between class execution and final creation
     """
 
-    def __init__(self, value):
+    def __init__(self, value, shadowed=None, member_name=None):
         self.value = value
+        # if member name is also used in a base class (None if unknown)
+        self.shadowed = shadowed
+        # the member name, if the class namespace has us under another key
+        self.member_name = member_name
 
     def __set_name__(self, enum_class, member_name):
         """
         convert each quasi-member into an instance of the new enum class
         """
         # first step: remove ourself from enum_class
-        delattr(enum_class, member_name)
+        type.__delattr__(enum_class, member_name)
+        member_name = self.member_name or member_name
         # second step: create member based on enum_class
         value = self.value
         kwds = {}
@@ -860,6 +1092,7 @@ class _proto_member:
                     raise te
         value = enum_member._value_
         enum_member._name_ = member_name
+        enum_member._hash_ = hash(member_name)
         enum_member.__objclass__ = enum_class
         enum_member.__init__(*init_args, **kwds)
         enum_member._sort_order_ = len(enum_class._member_names_)
@@ -877,23 +1110,13 @@ class _proto_member:
             # unless NoAlias was specified
             enum_class._member_names_.append(member_name)
         else:
-            nonunique = defaultdict(list)
             try:
                 try:
-                    # try to do a fast lookup to avoid the quadratic loop
-                    enum_member = enum_class._value2member_map_[value]
-                    if enum_class._unique_:
-                        nonunique[enum_member.name].append(member_name)
+                    canonical_member = enum_class._value2member_map_[value]
                 except TypeError:
                     # unhashable members are stored elsewhere
-                    for unhashable_value, canonical_member in enum_class._value2member_seq_:
-                        name = canonical_member.name
-                        if unhashable_value == enum_member._value_:
-                            if enum_class._unique_:
-                                nonunique[name].append(member_name)
-                            enum_member = canonical_member
-                            break
-                    else:
+                    canonical_member = _find_unhashable(enum_class, value)
+                    if canonical_member is None:
                         raise KeyError
             except KeyError:
                 # this could still be an alias if the value is multi-bit and the
@@ -911,16 +1134,15 @@ class _proto_member:
                     ):
                     # no other instances found, record this member in _member_names_
                     enum_class._member_names_.append(member_name)
-            if nonunique:
-                # duplicates not allowed if Unique specified
-                message = []
-                for name, aliases in nonunique.items():
-                    bad_aliases = ','.join(aliases)
-                    message.append('%s --> %s [%r]' % (name, bad_aliases, enum_class[name].value))
-                raise ValueError(
-                        '%s: duplicate names found: %s' %
-                            (enum_class.__name__, ';  '.join(message))
-                        )
+            else:
+                if enum_class._unique_:
+                    # duplicates not allowed if Unique specified
+                    raise ValueError(
+                            '%s: duplicate names found: %s --> %s [%r]' % (
+                                enum_class.__name__, canonical_member._name_,
+                                member_name, canonical_member._value_,
+                                ))
+                enum_member = canonical_member
         # if self.value is an `auto()`, replace the value attribute with the new enum member
         if isinstance(self.value, auto):
             self.value.enum_member = enum_member
@@ -928,23 +1150,28 @@ class _proto_member:
         found_descriptor = None
         descriptor_type = None
         class_type = None
-        for base in enum_class.__mro__[1:]:
-            attr = base.__dict__.get(member_name)
-            if attr is not None:
-                if isinstance(attr, (property, DynamicClassAttribute)):
-                    found_descriptor = attr
-                    class_type = base
-                    descriptor_type = 'enum'
-                    break
-                elif is_descriptor(attr):
-                    found_descriptor = attr
-                    descriptor_type = descriptor_type or 'desc'
-                    class_type = class_type or base
-                    continue
-                else:
-                    descriptor_type = 'attr'
-                    class_type = base
-        if found_descriptor:
+        if self.shadowed is not False:
+            for base in enum_class.__mro__[1:]:
+                attr = base.__dict__.get(member_name)
+                if attr is not None:
+                    if isinstance(attr, (property, DynamicClassAttribute, _member_attribute)):
+                        found_descriptor = attr
+                        class_type = base
+                        descriptor_type = 'enum'
+                        break
+                    elif is_descriptor(attr):
+                        found_descriptor = attr
+                        descriptor_type = descriptor_type or 'desc'
+                        class_type = class_type or base
+                        continue
+                    else:
+                        descriptor_type = 'attr'
+                        class_type = base
+        if member_name in _member_attributes:
+            # EnumType finds it in _member_map_, and instances still get the
+            # inherited descriptor
+            pass
+        elif found_descriptor:
             redirect = property()
             redirect.member = enum_member
             redirect.__set_name__(enum_class, member_name)
@@ -959,6 +1186,9 @@ class _proto_member:
             redirect._attr_type = descriptor_type
             redirect._cls_type = class_type
             setattr(enum_class, member_name, redirect)
+        elif self.shadowed is False:
+            # nothing to protect in the base classes
+            type.__setattr__(enum_class, member_name, enum_member)
         else:
             setattr(enum_class, member_name, enum_member)
         # now add to _member_map_ (even aliases)
@@ -971,20 +1201,30 @@ class _proto_member:
         enum_member._values_ = values
         for value in values:
             # first check if value has already been used
-            if enum_class._multivalue_ and (
-                    value in enum_class._value2member_map_
-                    or any(v == value for (v, m) in enum_class._value2member_seq_)
-                    ):
-                raise ValueError('%r has already been used' % (value, ))
+            if enum_class._multivalue_:
+                try:
+                    used = value in enum_class._value2member_map_
+                except TypeError:
+                    used = _find_unhashable(enum_class, value) is not None
+                if used:
+                    raise ValueError('%r has already been used' % (value, ))
             try:
                 # This may fail if value is not hashable. We can't add the value
-                # to the map, and by-value lookups for this value will be
-                # linear.
+                # to the map, so it is stored by key in the unhashable index.
                 if enum_class._noalias_:
                     raise TypeError('cannot use dict to store value')
                 enum_class._value2member_map_[value] = enum_member
             except TypeError:
-                enum_class._value2member_seq_ += ((value, enum_member), )
+                _add_unhashable(enum_class, value, enum_member)
+
+# _generate_next_value_ may change the last_values it is given, so each call
+# gets its own copy; aenum's own versions only read it, and get the list itself
+_readonly_gnv = set()
+
+def _gnv_values(generate, last_values):
+    if generate in _readonly_gnv:
+        return last_values
+    return last_values[:]
 
 class EnumDict(dict):
     """Track enum member order and ensure member names are not reused.
@@ -1039,7 +1279,7 @@ class EnumDict(dict):
                 ):
             return super(EnumDict, self).__getitem__(key)
         elif self._magicvalue:
-            value = self._generate_next_value(key, self._start, len(self._member_names), self._last_values[:])
+            value = self._generate_next_value(key, self._start, len(self._member_names), _gnv_values(self._generate_next_value, self._last_values))
             self.__setitem__(key, value)
             return value
         else:
@@ -1068,6 +1308,7 @@ class EnumDict(dict):
                     '_generate_next_value_', '_boundary_', '_numeric_repr_',
                     '_missing_', '_missing_value_', '_missing_name_',
                     '_iter_member_', '_iter_member_by_value_', '_iter_member_by_def_',
+                    '_pseudo_member_cache_', '_members_copy_',
                     ):
                 raise ValueError('%r: _sunder_ names, such as %r, are reserved for future Enum use'
                         % (self._cls_name, key)
@@ -1281,9 +1522,9 @@ class EnumDict(dict):
         if self._auto_args:
             if not isinstance(value, tuple):
                 value = (value, )
-            value = self._generate_next_value(key, self._start, len(self._member_names), self._last_values[:], *value)
+            value = self._generate_next_value(key, self._start, len(self._member_names), _gnv_values(self._generate_next_value, self._last_values), *value)
         else:
-            value = self._generate_next_value(key, self._start, len(self._member_names), self._last_values[:])
+            value = self._generate_next_value(key, self._start, len(self._member_names), _gnv_values(self._generate_next_value, self._last_values))
         if isinstance(value, tuple) and len(value) == 1:
             value = value[0]
         return value
@@ -1293,6 +1534,10 @@ no_arg = SentinelType('no_arg', (type, ), {})
 class EnumType(type):
     """Metaclass for Enum"""
 
+    name = _member_attribute_guard('name')
+    value = _member_attribute_guard('value')
+    values = _member_attribute_guard('values')
+
     @classmethod
     def __prepare__(metacls, cls, bases, init=None, start=None, settings=(), boundary=None, **kwds):
         metacls._check_for_existing_members_(cls, bases)
@@ -1400,6 +1645,8 @@ class EnumType(type):
             _missing_value_ = clsdict.pop('_missing_value_', None)
             _missing_name_ = clsdict.pop('_missing_name_', None)
             _boundary_ = clsdict.pop('_boundary_', None)
+            _pseudo_member_cache_ = clsdict.pop('_pseudo_member_cache_', None)
+            _members_copy_ = clsdict.pop('_members_copy_', None)
             _iter_member_ = clsdict.pop('_iter_member_', None)
             _iter_member_by_value_ = clsdict.pop('_iter_member_by_value_', None)
             _iter_member_by_def_ = clsdict.pop('_iter_member_by_def_', None)
@@ -1454,7 +1701,7 @@ class EnumType(type):
                     '_ignore_', '_create_pseudo_member_', '_create_pseudo_member_values_',
                     '_generate_next_value_', '_order_', '__new__',
                     '_missing_', '_missing_value_', '_missing_name_',
-                    '_boundary_',
+                    '_boundary_', '_pseudo_member_cache_', '_members_copy_',
                     '_iter_member_', '_iter_member_by_value_', '_iter_member_by_def_',
                 ):
                 attr = locals()[name]
@@ -1467,8 +1714,9 @@ class EnumType(type):
                 except KeyError:
                     # this error will be handled when _order_ is checked
                     pass
+            ordered = set(calced_order)
             for k, v in original_dict.items():
-                if k not in calced_order:
+                if k not in ordered:
                     clsdict[k] = v
             del _order_, _ignore_, _create_pseudo_member_, _create_pseudo_member_values_,
             del _generate_next_value_, _missing_, _missing_value_, _missing_name_
@@ -1531,7 +1779,12 @@ class EnumType(type):
         clsdict['_use_args_'] = new_uses_args
         #
         # convert future enum members into temporary _proto_members
-        # and record integer values in case this will be a Flag
+        # and record integer values in case this will be a Flag;
+        # also note which member names are used in the base classes
+        base_names = set()
+        for chain in bases:
+            for base in chain.__mro__:
+                base_names.update(base.__dict__)
         flag_mask = 0
         for name in member_names:
             value = test_value = clsdict[name]
@@ -1541,7 +1794,7 @@ class EnumType(type):
                 flag_mask |= test_value
             if isinstance(test_value, tuple) and test_value and isinstance(test_value[0], baseinteger) and test_value[0] > 0:
                 flag_mask |= test_value[0]
-            clsdict[name] = _proto_member(value)
+            clsdict[name] = _proto_member(value, shadowed=name in base_names)
         all_bits = 2 ** ((flag_mask).bit_length()) - 1
         #
         # temp stuff
@@ -1553,10 +1806,15 @@ class EnumType(type):
         #
         # house-keeping structures
         clsdict['_member_names_'] = []
-        clsdict['_member_map_'] = OrderedDict()
+        clsdict['_member_map_'] = member_map = OrderedDict()
+        if MappingProxyType is not None:
+            # a live view, so members added by extend_enum() show up as well
+            clsdict['_member_map_proxy_'] = MappingProxyType(member_map)
         clsdict['_member_type_'] = member_type
         clsdict['_value2member_map_'] = {}
-        clsdict['_value2member_seq_'] = ()
+        clsdict['_value2member_seq_'] = []
+        clsdict['_value2member_idx_'] = {}
+        clsdict['_value2member_dense_'] = (0, [])
         clsdict['_settings_'] = settings
         clsdict['_start_'] = start
         clsdict['_auto_init_'] = init
@@ -1575,6 +1833,7 @@ class EnumType(type):
         clsdict['_singles_mask_'] = 0
         clsdict['_all_bits_'] = all_bits
         clsdict['_inverted_'] = None
+        clsdict['_decomposition_'] = None
         # check for negative flag values and invert if found (using _proto_members)
         if Flag is not None and bases and issubclass(bases[-1], Flag):
             for n in member_names:
@@ -1616,10 +1875,23 @@ class EnumType(type):
         if '__doc__' not in clsdict:
             clsdict['__doc__'] = 'An enumeration.'
         #
+        # members named name, value, or values cannot be deleted from the new
+        # class (see _member_attribute_guard), so their proto-members go in
+        # under keys that can be, in the same place
+        keys = {}
+        for name in _member_attributes:
+            proto = dict.get(clsdict, name)
+            if isinstance(proto, _proto_member):
+                proto.member_name = name
+                keys[name] = '<member %s>' % name
+        namespace = clsdict
+        if keys:
+            namespace = OrderedDict([(keys.get(k, k), v) for k, v in clsdict.items()])
+        #
         # create our new Enum type
         try:
             exc = None
-            enum_class = type.__new__(metacls, cls, bases, clsdict)
+            enum_class = type.__new__(metacls, cls, bases, namespace)
         except RuntimeError as e:
             # any exceptions raised by _proto_member (aka member.__new__) will get converted to
             # a RuntimeError, so get that original exception back and raise
@@ -1637,7 +1909,8 @@ class EnumType(type):
         # __init_subclass__ protocols
         if pyver < PY3_6:
             for name in member_names:
-                enum_class.__dict__[name].__set_name__(enum_class, name)
+                key = keys.get(name, name)
+                enum_class.__dict__[key].__set_name__(enum_class, key)
             for name, obj in enum_class.__dict__.items():
                 if name in member_names:
                     continue
@@ -1749,6 +2022,7 @@ class EnumType(type):
             delattr(enum_class, '_singles_mask_')
             delattr(enum_class, '_all_bits_')
             delattr(enum_class, '_inverted_')
+            delattr(enum_class, '_decomposition_')
         elif Flag is not None and issubclass(enum_class, Flag):
             # set correct __iter__
             member_values = [m._value_ for m in enum_class if m._value_ is not None]
@@ -1761,6 +2035,8 @@ class EnumType(type):
                         for o in _order_
                         if o not in enum_class._member_map_ or is_single_bit(enum_class[o]._value_)
                         ]
+        if '_all_bits_' in enum_class.__dict__:
+            enum_class._pseudo_members_ = _pseudo_member_store(enum_class)
         #
         # check for constants with auto() values
         for k, v in enum_class.__dict__.items():
@@ -1769,13 +2045,14 @@ class EnumType(type):
         #
         if _order_:
             # _order_ step 3: remove aliases from _order_
+            canonical_names = set(enum_class._member_names_)
             _order_ = [
                     o
                     for o in _order_
                     if (
                         o not in enum_class._member_map_
                         or
-                        (o in enum_class._member_map_ and o in enum_class._member_names_)
+                        (o in enum_class._member_map_ and o in canonical_names)
                         )]
             # _order_ step 4: verify that _order_ and _member_names_ match
             if _order_ != enum_class._member_names_:
@@ -1783,6 +2060,9 @@ class EnumType(type):
                         'member order does not match _order_:\n%r\n%r'
                         % (enum_class._member_names_, _order_)
                         )
+        #
+        # integer values that fill a range can be looked up by index
+        _update_dense_lookup(enum_class)
         return enum_class
 
     def __bool__(cls):
@@ -1811,6 +2091,57 @@ class EnumType(type):
         # otherwise, functional API: we're creating a new Enum type
         return cls._create_(value, names, module=module, qualname=qualname, type=type, start=start, boundary=boundary)
 
+    def lookup_many(cls, values, default=None, errors='raise'):
+        """Return a list of the members matching each of `values`.
+
+        Equivalent to `[cls(v) for v in values]`, but known values cost a single
+        dict lookup, and values that go through `_missing_value_` are only
+        resolved once per call.
+
+        `errors` controls what happens with values that are not valid:
+            'raise'   -> the ValueError is raised  [default]
+            'skip'    -> the value is left out of the results
+            'default' -> `default` is used in its place
+        """
+        if errors not in ('raise', 'skip', 'default'):
+            raise ValueError("errors must be 'raise', 'skip', or 'default', not %r" % (errors, ))
+        if NoAlias in cls._settings_:
+            raise TypeError('NoAlias enumerations cannot be looked up by value')
+        get_member = cls._value2member_map_.get
+        new = cls.__new__
+        missed = {}
+        results = []
+        append = results.append
+        for value in values:
+            try:
+                member = get_member(value)
+            except TypeError:
+                # unhashable, so cannot be remembered in missed
+                try:
+                    append(new(cls, value))
+                except ValueError:
+                    if errors == 'raise':
+                        raise
+                    elif errors == 'default':
+                        append(default)
+                continue
+            if member is None:
+                member = missed.get(value, no_arg)
+                if member is no_arg:
+                    try:
+                        member = new(cls, value)
+                    except ValueError:
+                        if errors == 'raise':
+                            raise
+                        member = None
+                    missed[value] = member
+                if member is None:
+                    if errors == 'default':
+                        append(default)
+                    continue
+            append(member)
+        return results
+
     def __contains__(cls, value):
         """Return True if `value` is in `cls`.
 
@@ -1820,10 +2151,15 @@ class EnumType(type):
         """
         if isinstance(value, cls):
             return True
+        if type(value) is int:
+            offset, dense = cls._value2member_dense_
+            index = value - offset
+            if 0 <= index < len(dense) and dense[index] is not None:
+                return True
         try:
             return value in cls._value2member_map_
         except TypeError:
-            return value in [v for v,m in cls._value2member_seq_]
+            return _find_unhashable(cls, value) is not None
 
     def __delattr__(cls, attr):
         # nicer error message when someone tries to delete an attribute
@@ -1837,7 +2173,7 @@ class EnumType(type):
             raise AttributeError(
                     "%s: cannot delete constant %r" % (cls.__name__, attr),
                     )
-        elif isinstance(found_attr, property):
+        elif isinstance(found_attr, (property, _member_attribute)):
             raise AttributeError(
                     "%s: cannot delete property %r" % (cls.__name__, attr),
                     )
@@ -1869,9 +2205,12 @@ class EnumType(type):
         """Returns a mapping of member name->value.
 
         This mapping lists all enum members, including aliases. Note that this
-        is a copy of the internal mapping.
+        is a read-only view of the internal mapping (a copy on Python 2, or if
+        the class sets _members_copy_ to True).
         """
-        return cls._member_map_.copy()
+        if cls._members_copy_ or MappingProxyType is None:
+            return cls._member_map_.copy()
+        return cls._member_map_proxy_
 
     def __getitem__(cls, name):
         try:
@@ -2004,7 +2343,7 @@ class EnumType(type):
             original_names, names = names, []
             last_values = []
             for count, name in enumerate(original_names):
-                value = generate(name, start, count, last_values[:])
+                value = generate(name, start, count, _gnv_values(generate, last_values))
                 last_values.append(value)
                 names.append((name, value))
         # Here, names is either an iterable of (name, value) or a mapping.
@@ -2205,6 +2544,8 @@ enum_dict = _Addendum(
         ns=globals(),
         )
 
+enum_dict['_members_copy_'] = False
+
 @enum_dict
 @classmethod
 def __signature__(cls):
@@ -2244,6 +2585,14 @@ def __new__(cls, value):
     # all enum instances are actually created during class construction
     # without calling this method; this method is called by the metaclass'
     # __call__ (i.e. Color(3) ), and by pickle
+    if type(value) is int:
+        # contiguous integer values are stored by index (never for NoAlias)
+        offset, dense = cls._value2member_dense_
+        index = value - offset
+        if 0 <= index < len(dense):
+            member = dense[index]
+            if member is not None:
+                return member
     if NoAlias in cls._settings_:
         raise TypeError('NoAlias enumerations cannot be looked up by value')
     if type(value) is cls:
@@ -2258,10 +2607,10 @@ def __new__(cls, value):
         # Not found, no need to do long O(n) search
         pass
     except TypeError:
-        # not there, now do long search -- O(n) behavior
-        for member_value, member in cls._value2member_seq_:
-            if member_value == value:
-                return member
+        # not there, check the unhashable values
+        member = _find_unhashable(cls, value)
+        if member is not None:
+            return member
     # still not found -- try _missing_ hook
     result = cls._missing_value_(value)
     if isinstance(result, cls):
@@ -2367,40 +2716,60 @@ def __format__(self, format_spec):
 
 @enum_dict
 def __hash__(self):
-    return hash(self._name_)
+    # _hash_ is set as members are created, but a custom _missing_ may make
+    # members without it
+    try:
+        return self._hash_
+    except AttributeError:
+        return hash(self._name_)
 
 @enum_dict
 def __reduce_ex__(self, proto):
     return self.__class__, (self._value_, )
 
 @enum_dict
-def __le__(self, other):
-    raise TypeError("unorderable types: %s() <= %s()" % (self.__class__.__name__, other.__class__.__name__))
+def __copy__(self):
+    return self
 
 @enum_dict
-def __lt__(self, other):
-    raise TypeError("unorderable types: %s() < %s()" % (self.__class__.__name__, other.__class__.__name__))
+def __deepcopy__(self, memo):
+    return self
 
-@enum_dict
-def __ge__(self, other):
-    raise TypeError("unorderable types: %s() >= %s()" % (self.__class__.__name__, other.__class__.__name__))
+# on Python 3 members use object's comparisons: equality is identity (members
+# are singletons) and ordering raises TypeError, without running any Python
+# code -- defining any of them here would route == through Python as well
+if PY2:
+    @enum_dict
+    def __le__(self, other):
+        raise TypeError("unorderable types: %s() <= %s()" % (self.__class__.__name__, other.__class__.__name__))
 
-@enum_dict
-def __gt__(self, other):
-    raise TypeError("unorderable types: %s() > %s()" % (self.__class__.__name__, other.__class__.__name__))
+    @enum_dict
+    def __lt__(self, other):
+        raise TypeError("unorderable types: %s() < %s()" % (self.__class__.__name__, other.__class__.__name__))
 
+    @enum_dict
+    def __ge__(self, other):
+        raise TypeError("unorderable types: %s() >= %s()" % (self.__class__.__name__, other.__class__.__name__))
 
-@enum_dict
-def __eq__(self, other):
-    if isinstance(other, self.__class__):
-        return self is other
-    return NotImplemented
+    @enum_dict
+    def __gt__(self, other):
+        raise TypeError("unorderable types: %s() > %s()" % (self.__class__.__name__, other.__class__.__name__))
 
-@enum_dict
-def __ne__(self, other):
-    if isinstance(other, self.__class__):
-        return self is not other
-    return NotImplemented
+    @enum_dict
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, self.__class__):
+            return False
+        return NotImplemented
+
+    @enum_dict
+    def __ne__(self, other):
+        if self is other:
+            return False
+        if isinstance(other, self.__class__):
+            return True
+        return NotImplemented
 
 
     # enum.property is used to provide access to the `name`, `value', etc.,
@@ -2410,23 +2779,13 @@ def __ne__(self, other):
     # members are not set directly on the enum class -- enum.property will
     # look them up in _member_map_.
 
-@enum_dict
-@property
-def name(self):
-    return self._name_
-
-@enum_dict
-@property
-def value(self):
-    return self._value_
-
-@enum_dict
-@property
-def values(self):
-    return self._values_
+enum_dict['name'] = _member_attribute('_name_', 'The name of the Enum member.')
+enum_dict['value'] = _member_attribute('_value_', 'The value of the Enum member.')
+enum_dict['values'] = _member_attribute('_values_', 'All the values of the Enum member.')
 
 _enum_base = StdlibEnum or object
 Enum = EnumType('Enum', (_enum_base, ), enum_dict.resolve())
+_readonly_gnv.add(Enum.__dict__['_generate_next_value_'].__func__)
 del enum_dict
 
     # Enum has now been created
@@ -2440,6 +2799,139 @@ def pickle_by_enum_name(self, proto):
     # should not be used with Flag-type enums
     return getattr, (self.__class__, self._name_)
 
+# pickling by definition
+#
+# classes made by the functional API may not be importable by name (the
+# module could not be found, or they were built inside a function from data
+# loaded at run time); pickle_by_definition() lets such a class pickle as the
+# arguments needed to build it again.  Each process builds a definition once
+# and keeps it under the hash of its contents for as long as the class is in
+# use, so every pickle of it loaded there meanwhile gives the same class.
+#
+# pickle saves a class by name without asking its metaclass, so the hook is a
+# copyreg.dispatch_table entry for the metaclass; it stays registered for the
+# life of the process, and classes of that metaclass that were not passed to
+# pickle_by_definition() are still pickled by name through it.
+
+_definitions = weakref.WeakValueDictionary()
+_definitions_lock = Lock()
+
+def pickle_by_definition(cls):
+    """
+    Make a functionally created Enum or NamedTuple class pickle as its
+    definition, so it (and its members or instances) can be sent to processes
+    that cannot import it.
+
+    Returns the class to use: if an identical definition was already
+    registered in this process, that class.
+
+    The first call for a metaclass registers a reducer for it in
+    copyreg.dispatch_table, process-wide; other classes of that metaclass
+    still pickle by name.
+    """
+    if isinstance(cls, EnumType):
+        definition = _enum_definition(cls)
+        base_reduce = Enum.__dict__['__reduce_ex__']
+    elif isinstance(cls, NamedTupleMeta):
+        definition = _namedtuple_definition(cls)
+        base_reduce = NamedTuple.__dict__['__reduce_ex__']
+    else:
+        raise TypeError('%r is not an Enum or NamedTuple class' % (cls, ))
+    digest = hashlib.sha256(pickle.dumps(definition, 2)).hexdigest()
+    with _definitions_lock:
+        registered = _definitions.setdefault(digest, cls)
+    if registered is not cls:
+        return registered
+    reduce_ex = cls.__dict__.get('__reduce_ex__')
+    if getattr(reduce_ex, '__name__', None) == '_break_on_call_reduce':
+        # made unpicklable because the module was unknown
+        type.__setattr__(cls, '__reduce_ex__', base_reduce)
+    type.__setattr__(cls, '_definition_', (digest, definition))
+    if type(cls) not in _copyreg.dispatch_table:
+        _copyreg.pickle(type(cls), _reduce_class)
+    return cls
+
+def _check_no_methods(cls):
+    for name, obj in cls.__dict__.items():
+        if (
+                not is_dunder(name) and not is_sunder(name)
+                and callable(obj) and not isinstance(obj, cls)
+            ):
+            raise TypeError('%s: only classes without methods can be pickled by definition' % (cls.__name__, ))
+
+def _enum_definition(cls):
+    if cls.__dict__.get('_definition_') is not None:
+        return cls._definition_[1]
+    _check_no_methods(cls)
+    if MultiValue in cls._settings_:
+        value_of = lambda member: member._values_
+    else:
+        value_of = lambda member: member._value_
+    members = tuple([(name, value_of(member)) for name, member in cls._member_map_.items()])
+    return (
+            'enum', cls.__name__, getattr(cls, '__qualname__', cls.__name__), cls.__module__,
+            cls.__bases__, members, cls.__dict__.get('_boundary_'),
+            )
+
+def _namedtuple_definition(cls):
+    if cls.__dict__.get('_definition_') is not None:
+        return cls._definition_[1]
+    _check_no_methods(cls)
+    inherited = set()
+    for base in cls.__bases__:
+        if isinstance(base, NamedTupleMeta):
+            inherited.update(base._fields_ + base._aliases_)
+    fields = []
+    for name in cls._fields_ + cls._aliases_:
+        if name in inherited:
+            continue
+        descriptor = cls.__dict__[name]
+        if descriptor.default is undefined:
+            fields.append((name, (descriptor.index, descriptor.__doc__)))
+        else:
+            fields.append((name, (descriptor.index, descriptor.__doc__, descriptor.default)))
+    return (
+            'namedtuple', cls.__name__, getattr(cls, '__qualname__', cls.__name__), cls.__module__,
+            cls.__bases__, tuple(fields), cls._size_._value_,
+            )
+
+def _reduce_class(cls):
+    marked = cls.__dict__.get('_definition_')
+    if marked is None:
+        # pickled by reference, as usual
+        return getattr(cls, '__qualname__', cls.__name__)
+    return _class_from_definition, marked
+
+def _class_from_definition(digest, definition):
+    """
+    return the class for definition, building it if this process has not
+    """
+    cls = _definitions.get(digest)
+    if cls is None:
+        with _definitions_lock:
+            cls = _definitions.get(digest)
+            if cls is None:
+                kind, name, qualname, module, bases, items, extra = definition
+                # the most derived metaclass of the bases, as type() picks it
+                # (on Python 2 a NamedTuple's bases end with tuple)
+                metacls = type(bases[0])
+                for base in bases[1:]:
+                    if issubclass(type(base), metacls):
+                        metacls = type(base)
+                clsdict = metacls.__prepare__(name, bases)
+                for item_name, item in items:
+                    clsdict[item_name] = item
+                if kind == 'enum':
+                    cls = metacls.__new__(metacls, name, bases, clsdict, boundary=extra)
+                else:
+                    clsdict['_size_'] = TupleSize(extra)
+                    cls = metacls.__new__(metacls, name, bases, clsdict)
+                cls.__module__ = module
+                cls.__qualname__ = qualname
+                type.__setattr__(cls, '_definition_', (digest, definition))
+                _definitions[digest] = cls
+    return cls
+
 def _dataclass_repr(self):
     dcf = self.__dataclass_fields__
     return ', '.join(
@@ -2525,6 +3017,10 @@ class UpperStrEnum(StrEnum):
         return name.upper()
 
 
+_readonly_gnv.add(StrEnum.__dict__['_generate_next_value_'].__func__)
+_readonly_gnv.add(UpperStrEnum.__dict__['_generate_next_value_'].__func__)
+
+
 # Specialty Enums
 if PY3:
     class AutoEnum(Enum):
@@ -2545,7 +3041,7 @@ class AutoNumberEnum(Enum):
     """
 
     def __new__(cls, *args, **kwds):
-        value = len(cls.__members__) + 1
+        value = len(cls._member_map_) + 1
         if cls._member_type_ is int:
             obj = int.__new__(cls, value)
         elif cls._member_type_ is long:
@@ -2606,6 +3102,112 @@ if sqlite3:
             if protocol is sqlite3.PrepareProtocol:
                 return self.name
 
+    def register_sqlite(enum_class, store='value', typename=None):
+        """
+        Register a sqlite3 adapter and converter for enum_class.
+
+        store:     'value', 'name', or 'index' (position in definition order;
+                   not for Flags)
+        typename:  declared column type the converter is registered for
+                   (defaults to the class name); connections need
+                   detect_types=sqlite3.PARSE_DECLTYPES to use it
+
+        Returns enum_class, so it can be used as a decorator.
+        """
+        if not (isinstance(enum_class, EnumType) and enum_class._member_map_):
+            raise TypeError('%r is not an enumeration with members' % (enum_class, ))
+        is_flag = issubclass(enum_class, Flag)
+        if store == 'value':
+            adapt = _attrgetter('_value_')
+            lookup = enum_class
+            decode = _sqlite_decoder(enum_class)
+        elif store == 'name':
+            members = enum_class._member_map_
+            decode = _sqlite_text
+            if is_flag:
+                # sqlite3 hands converters None for empty values, so unnamed
+                # flags (such as 0) are stored as their value
+                adapt = lambda member: member._name_ or str(member._value_)
+                def lookup(name):
+                    value = 0
+                    for n in name.split('|'):
+                        if n.isdigit():
+                            value |= int(n)
+                        else:
+                            value |= members[n]._value_
+                    return enum_class(value)
+            else:
+                adapt = _attrgetter('_name_')
+                lookup = members.__getitem__
+        elif store == 'index':
+            if is_flag:
+                raise TypeError('Flag members cannot be stored by index')
+            adapt, lookup = _sqlite_index(enum_class)
+            decode = int
+        else:
+            raise ValueError("store must be 'value', 'name', or 'index', not %r" % (store, ))
+        # every member of a class with the value is cached, so the lookup
+        # only runs once per distinct stored value
+        cache = {}
+        def convert(raw):
+            try:
+                return cache[raw]
+            except KeyError:
+                member = cache[raw] = lookup(decode(raw))
+                return member
+        sqlite3.register_adapter(enum_class, adapt)
+        sqlite3.register_converter(typename or enum_class.__name__, convert)
+        return enum_class
+
+    def _sqlite_text(raw):
+        return raw.decode('utf-8')
+
+    def _sqlite_decoder(enum_class):
+        """
+        return the function that turns the bytes sqlite3 gives a converter
+        back into a value of enum_class
+        """
+        if issubclass(enum_class, Flag):
+            return int
+        value_types = set([type(m._value_) for m in enum_class._member_map_.values()])
+        for types, decode in (
+                (baseinteger, int),
+                (float, float),
+                (basestring, _sqlite_text),
+                (bytes, bytes),
+            ):
+            if all(issubclass(t, types) for t in value_types):
+                return decode
+        raise TypeError(
+                '%s values must all be integers, floats, strings, or bytes to be stored by value'
+                % (enum_class.__name__, )
+                )
+
+    def _sqlite_index(enum_class):
+        """
+        return the adapter and lookup for storing members by position; the
+        positions are rebuilt when extend_enum() has added members
+        """
+        positions = {}
+        members = []
+        def refresh():
+            members[:] = list(enum_class)
+            positions.clear()
+            positions.update([(m, i) for i, m in enumerate(members)])
+        def adapt(member):
+            try:
+                return positions[member]
+            except KeyError:
+                refresh()
+                return positions[member]
+        def lookup(index):
+            if index >= len(members):
+                refresh()
+            if not 0 <= index < len(members):
+                raise ValueError('%r is not a valid %s index' % (index, enum_class.__name__))
+            return members[index]
+        return adapt, lookup
+
 
 class UniqueEnum(Enum):
     """
@@ -2644,6 +3246,103 @@ def extend_enum(enumeration, name, *args, **kwds):
     """
     Add a new member to an existing Enum.
     """
+    new_member = _extend_enum(enumeration, name, args)
+    if hasattr(enumeration, '_value2member_dense_'):
+        _extend_dense_lookup(enumeration, new_member)
+    return new_member
+
+def extend_enum_many(enumeration, members):
+    """
+    Add several new members to an existing Enum.
+
+    members: a mapping, or an iterable of (name, args) pairs; args is what
+             extend_enum() would be given after the name -- a tuple of
+             arguments, a single value, or () to have the value generated
+
+    Either all the new members are added or, if any of them fails, none are.
+    Returns a list of the new members (an alias returns its canonical member).
+    """
+    if isinstance(members, dict):
+        members = members.items()
+    batch = []
+    names = set()
+    for name, args in members:
+        if name in names:
+            raise TypeError('%r used more than once' % (name, ))
+        names.add(name)
+        if not isinstance(args, tuple):
+            args = (args, )
+        batch.append((name, args))
+    state = _save_enum_state(enumeration, names)
+    new_members = []
+    last_values = None
+    try:
+        for name, args in batch:
+            if not args and last_values is None:
+                last_values = [m.value for m in enumeration]
+            count = len(enumeration._member_names_)
+            new_member = _extend_enum(enumeration, name, args, last_values)
+            if last_values is not None and len(enumeration._member_names_) > count:
+                last_values.append(new_member._value_)
+            new_members.append(new_member)
+    except Exception:
+        _restore_enum_state(enumeration, state)
+        raise
+    if hasattr(enumeration, '_value2member_dense_'):
+        _update_dense_lookup(enumeration)
+    return new_members
+
+def _save_enum_state(enumeration, names):
+    """
+    copy the structures extend_enum() changes, for _restore_enum_state()
+    """
+    state = {'__dict__': set(enumeration.__dict__), 'descriptors': []}
+    for attr in ('_member_names_', '_value2member_seq_'):
+        if attr in enumeration.__dict__:
+            state[attr] = list(enumeration.__dict__[attr])
+    for attr in ('_member_map_', '_value2member_map_'):
+        if attr in enumeration.__dict__:
+            state[attr] = enumeration.__dict__[attr].copy()
+    if '_value2member_idx_' in enumeration.__dict__:
+        state['_value2member_idx_'] = dict(
+                (k, list(v)) for k, v in enumeration._value2member_idx_.items()
+                )
+    for attr in ('_all_bits_', '_flag_mask_', '_singles_mask_'):
+        if attr in enumeration.__dict__:
+            state[attr] = enumeration.__dict__[attr]
+    # superclass properties get pointed at the new member
+    for name in names:
+        for base in enumeration.__mro__[1:]:
+            descriptor = base.__dict__.get(name)
+            if isinstance(descriptor, (property, DynamicClassAttribute)):
+                state['descriptors'].append((descriptor, descriptor.__dict__.get('member', undefined)))
+                break
+    return state
+
+def _restore_enum_state(enumeration, state):
+    """
+    undo any changes made since _save_enum_state()
+    """
+    for name in set(enumeration.__dict__) - state['__dict__']:
+        type.__delattr__(enumeration, name)
+    for attr in ('_member_names_', '_value2member_seq_'):
+        if attr in state:
+            enumeration.__dict__[attr][:] = state[attr]
+    for attr in ('_member_map_', '_value2member_map_', '_value2member_idx_'):
+        if attr in state:
+            mapping = enumeration.__dict__[attr]
+            mapping.clear()
+            mapping.update(state[attr])
+    for attr in ('_all_bits_', '_flag_mask_', '_singles_mask_'):
+        if attr in state:
+            type.__setattr__(enumeration, attr, state[attr])
+    for descriptor, member in state['descriptors']:
+        if member is undefined:
+            descriptor.__dict__.pop('member', None)
+        else:
+            descriptor.member = member
+
+def _extend_enum(enumeration, name, args, last_values=None):
     # there are four possibilities:
     # - extending an aenum Enum or 3.11+ enum Enum
     # - extending an aenum Flag or 3.11+ enum Flag
@@ -2651,18 +3350,14 @@ def extend_enum(enumeration, name, *args, **kwds):
     # - extending a 3.11+ stdlib Flag
     #
     # fail early if name is already in the enumeration
-    if (
-            name in enumeration.__dict__
-            or name in enumeration._member_map_
-            or name in [t[1] for t in getattr(enumeration, '_value2member_seq_', ())]
-        ):
+    if name in enumeration.__dict__ or name in enumeration._member_map_:
         raise TypeError('%r already in use as %r' % (name, enumeration.__dict__.get(name, enumeration[name])))
     # and check for other instances in parent classes
     descriptor = None
     for base in enumeration.__mro__[1:]:
         descriptor = base.__dict__.get(name)
         if descriptor is not None:
-            if isinstance(descriptor, (property, DynamicClassAttribute)):
+            if isinstance(descriptor, (property, DynamicClassAttribute, _member_attribute)):
                 break
             else:
                 raise TypeError('%r already in use in superclass %r' % (name, base.__name__))
@@ -2671,7 +3366,6 @@ def extend_enum(enumeration, name, *args, **kwds):
         _member_names_ = enumeration._member_names_
         _member_type_ = enumeration._member_type_
         _value2member_map_ = enumeration._value2member_map_
-        base_attributes = set([a for b in enumeration.mro() for a in b.__dict__])
     except AttributeError:
         raise TypeError('%r is not a supported Enum' % (enumeration, ))
     try:
@@ -2693,14 +3387,15 @@ def extend_enum(enumeration, name, *args, **kwds):
     mt_new = _member_type_.__new__
     _new = getattr(enumeration, '_new_member_', None) or getattr(enumeration, '__new_member__', None) or mt_new
     if not args:
-        last_values = [m.value for m in enumeration]
+        if last_values is None:
+            last_values = [m.value for m in enumeration]
         count = len(enumeration)
         start = getattr(enumeration, '_start_', None)
         if start is None:
             start = last_values and (last_values[-1] + 1) or 1
         _gnv = getattr(enumeration, '_generate_next_value_', None)
         if _gnv is not None:
-            args = ( _gnv(name, start, count, last_values), )
+            args = ( _gnv(name, start, count, _gnv_values(_gnv, last_values)), )
         else:
             # must be a 3.4 or 3.5 Enum
             args = (start, )
@@ -2776,20 +3471,17 @@ def extend_enum(enumeration, name, *args, **kwds):
         return _finalize_extend_enum(enumeration, new_member, bits=_all_bits_, mask=_flag_mask_)
     else:
         # handle "normal" aliases
-        new_values = new_member._values_
-        for canonical_member in _member_map_.values():
-            canonical_values_ = getattr(canonical_member, '_values_', [canonical_member._value_])
-            for canonical_value in canonical_values_:
-                for new_value in new_values:
-                    if canonical_value == new_value:
-                        # name is an alias
-                        if _unique_ or _multi_value_:
-                            # aliases not allowed in Unique and MultiValue enums
-                            raise ValueError('%r is a duplicate of %r' % (new_member, canonical_member))
-                        else:
-                            # aliased name can be added, remaining checks irrelevant
-                            # aliases don't appear in member names (only in __members__ and _member_map_).
-                            return _finalize_extend_enum(enumeration, canonical_member, name=name, bits=_all_bits_, mask=_flag_mask_, is_alias=True)
+        for new_value in new_member._values_:
+            canonical_member = _find_named_member(enumeration, new_value)
+            if canonical_member is not None:
+                # name is an alias
+                if _unique_ or _multi_value_:
+                    # aliases not allowed in Unique and MultiValue enums
+                    raise ValueError('%r is a duplicate of %r' % (new_member, canonical_member))
+                else:
+                    # aliased name can be added, remaining checks irrelevant
+                    # aliases don't appear in member names (only in __members__ and _member_map_).
+                    return _finalize_extend_enum(enumeration, canonical_member, name=name, bits=_all_bits_, mask=_flag_mask_, is_alias=True)
         # not a standard alias, but maybe a flag alias
         if pyver < PY3_6:
             flag_bases = Flag,
@@ -2814,19 +3506,25 @@ def extend_enum(enumeration, name, *args, **kwds):
 
 def _finalize_extend_enum(enumeration, new_member, name=None, bits=None, mask=None, is_alias=False):
     name = name or new_member.name
+    new_member._hash_ = hash(new_member._name_)
     descriptor = None
     for base in enumeration.__mro__[1:]:
         descriptor = base.__dict__.get(name)
         if descriptor is not None:
-            if isinstance(descriptor, (property, DynamicClassAttribute)):
+            if isinstance(descriptor, (property, DynamicClassAttribute, _member_attribute)):
                 break
             else:
                 raise TypeError('%r already in use in superclass %r' % (name, base.__name__))
-    if not descriptor:
+    if name in _member_attributes and isinstance(enumeration, EnumType):
+        # EnumType finds it in _member_map_
+        pass
+    elif not descriptor or isinstance(descriptor, _member_attribute):
         # get redirect in place before adding to _member_map_
         redirect = property()
         redirect.__set_name__(enumeration, name)
         redirect.member = new_member
+        if descriptor is not None:
+            redirect.fget = descriptor.fget
         setattr(enumeration, name, redirect)
     elif name not in enumeration.__dict__:
         descriptor.member = new_member
@@ -2838,7 +3536,7 @@ def _finalize_extend_enum(enumeration, new_member, name=None, bits=None, mask=No
         try:
             enumeration._value2member_map_[v] = new_member
         except TypeError:
-            enumeration._value2member_seq_ += ((v, new_member), )
+            _add_unhashable(enumeration, v, new_member)
     if bits:
         enumeration._all_bits_ = bits
         enumeration._flag_mask_ = mask
@@ -2846,6 +3544,26 @@ def _finalize_extend_enum(enumeration, new_member, name=None, bits=None, mask=No
             enumeration._singles_mask_ |= new_member._value_
     return new_member
 
+def _find_named_member(enumeration, value):
+    """
+    return the named member (not a Flag pseudo-member) with value, or None
+    """
+    try:
+        member = enumeration._value2member_map_.get(value)
+    except TypeError:
+        if hasattr(enumeration, '_value2member_idx_'):
+            member = _find_unhashable(enumeration, value)
+        else:
+            # stdlib Enum -- search the members
+            member = None
+            for candidate in enumeration._member_map_.values():
+                if candidate._value_ == value:
+                    member = candidate
+                    break
+    if member is not None and enumeration._member_map_.get(member._name_) is not member:
+        member = None
+    return member
+
 def unique(enumeration):
     """
     Class decorator that ensures only unique members exist in an enumeration.
@@ -2888,6 +3606,134 @@ except ImportError:
         KEEP = auto()
 export(FlagBoundary, globals())
 
+# pseudo-members
+#
+# the composite and out-of-range members a Flag creates on demand are kept in
+# _pseudo_members_, according to the class' _pseudo_member_cache_ setting:
+#
+#   None    -> kept forever in _value2member_map_ (the default)
+#   integer -> at most that many are kept, the least recently used are dropped
+#              (but still found while referenced elsewhere, if possible)
+#   'weak'  -> kept only while referenced elsewhere
+#
+# canonical members always stay in _value2member_map_; `created` counts the
+# pseudo-members made, `evicted` the cache entries dropped
+
+class _PseudoMembers(object):
+    """
+    keep pseudo-members in _value2member_map_
+    """
+
+    def __init__(self, enum_class):
+        self._map = enum_class._value2member_map_
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, value):
+        return self._map.get(value)
+
+    def add(self, value, member):
+        """
+        store member, unless another thread got there first; return the stored member
+        """
+        return self._map.setdefault(value, member)
+
+
+class _LRUPseudoMembers(_PseudoMembers):
+    """
+    keep the most recently used pseudo-members
+
+    if members can be weakly referenced (Flag equality is identity) evicted
+    pseudo-members are still found while in use elsewhere
+    """
+
+    def __init__(self, enum_class, maxsize):
+        if maxsize < 1:
+            raise ValueError('%r: _pseudo_member_cache_ must be at least 1, not %r' % (enum_class, maxsize))
+        self._map = OrderedDict()
+        self._lock = Lock()
+        self._retired = None
+        if enum_class.__weakrefoffset__:
+            self._retired = _WeakPseudoMembers(enum_class)
+        self.maxsize = maxsize
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, value):
+        with self._lock:
+            member = self._map.pop(value, None)
+            if member is None and self._retired is not None:
+                member = self._retired.get(value)
+            if member is not None:
+                self._store(value, member)
+            return member
+
+    def add(self, value, member):
+        with self._lock:
+            stored = self._map.pop(value, None)
+            if stored is None and self._retired is not None:
+                stored = self._retired.get(value)
+            if stored is not None:
+                member = stored
+            self._store(value, member)
+            return member
+
+    def _store(self, value, member):
+        self._map[value] = member
+        while len(self._map) > self.maxsize:
+            old_value = next(iter(self._map))
+            old_member = self._map.pop(old_value)
+            if self._retired is not None:
+                self._retired.add(old_value, old_member)
+            self.evicted += 1
+
+
+class _WeakPseudoMembers(_PseudoMembers):
+    """
+    keep pseudo-members that are still in use
+    """
+
+    def __init__(self, enum_class):
+        if not enum_class.__weakrefoffset__:
+            raise TypeError('%r: members do not support weak references' % (enum_class, ))
+        self._map = {}
+        # re-entrant: a collected member's callback can run while add() holds it
+        self._lock = RLock()
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, value):
+        ref = self._map.get(value)
+        if ref is not None:
+            return ref()
+
+    def add(self, value, member):
+        with self._lock:
+            stored = self.get(value)
+            if stored is not None:
+                return stored
+            def dropped(ref, value=value):
+                with self._lock:
+                    if self._map.get(value) is ref:
+                        del self._map[value]
+                        self.evicted += 1
+            self._map[value] = weakref.ref(member, dropped)
+            return member
+
+
+def _pseudo_member_store(enum_class):
+    policy = enum_class._pseudo_member_cache_
+    if policy is None:
+        return _PseudoMembers(enum_class)
+    elif policy == 'weak':
+        return _WeakPseudoMembers(enum_class)
+    elif isinstance(policy, baseinteger):
+        return _LRUPseudoMembers(enum_class, policy)
+    raise TypeError(
+            "%r: _pseudo_member_cache_ must be None, an integer, or 'weak', not %r"
+            % (enum_class, policy)
+            )
+
 if StdlibFlag:
     _flag_bases = Enum, StdlibFlag
 else:
@@ -2901,6 +3747,7 @@ flag_dict = _Addendum(
 
 flag_dict['_boundary_'] = STRICT
 flag_dict['_numeric_repr_'] = repr
+flag_dict['_pseudo_member_cache_'] = None
 
 @flag_dict
 def _generate_next_value_(name, start, count, last_values, *args, **kwds):
@@ -2975,6 +3822,10 @@ def _create_pseudo_member_(cls, *values):
         raise ValueError(
                 "%r is not a valid %s" % (error_value, cls.__name__)
                 )
+    pseudo_members = cls._pseudo_members_
+    pseudo_member = pseudo_members.get(value)
+    if pseudo_member is not None:
+        return pseudo_member
     # check boundaries
     # - value must be in range (e.g. -16 <-> +15, i.e. ~15 <-> 15)
     # - value must not include any skipped flags (e.g. if bit 2 is not
@@ -3024,9 +3875,10 @@ def _create_pseudo_member_(cls, *values):
                 )
     values = (value, ) + values[1:]
     # value may have been altered due to boundary checks -- see if it is known
-    if value in cls._value2member_map_:
-        pseudo_member = cls._value2member_map_[value]
-    else:
+    pseudo_member = cls._value2member_map_.get(value)
+    if pseudo_member is None:
+        pseudo_member = pseudo_members.get(value)
+    if pseudo_member is None:
         # get members and unknown
         unknown = value & ~flag_mask
         aliases = value & ~singles_mask
@@ -3074,10 +3926,12 @@ def _create_pseudo_member_(cls, *values):
                 pseudo_member._name_ += '|%s' % cls._numeric_repr_(unknown)
         else:
             pseudo_member._name_ = None
-        # use setdefault in case another thread already created a composite
-        pseudo_member = cls._value2member_map_.setdefault(value, pseudo_member)
+        pseudo_member._hash_ = hash(pseudo_member._name_)
+        pseudo_members.created += 1
+        # in case another thread already created a composite
+        pseudo_member = pseudo_members.add(value, pseudo_member)
     if neg_value is not None:
-        cls._value2member_map_[neg_value] = pseudo_member
+        pseudo_members.add(neg_value, pseudo_member)
     return pseudo_member
 
 @flag_dict
@@ -3111,8 +3965,14 @@ def __iter__(self):
     """
     Returns flags in definition order.
     """
-    for member in self._iter_member_(self._value_):
-        yield member
+    # the members are found once per value and kept, together with the
+    # single-bit members they were found from (extend_enum() can add more)
+    singles_mask = self._singles_mask_
+    decomposition = self._decomposition_
+    if decomposition is None or decomposition[0] != singles_mask:
+        decomposition = singles_mask, tuple(self._iter_member_(self._value_))
+        self._decomposition_ = decomposition
+    return iter(decomposition[1])
 
 @flag_dict
 def __len__(self):
@@ -3154,17 +4014,39 @@ def _get_value(self, flag):
 
 @flag_dict
 def __or__(self, other):
-        other_value = self._get_value(other)
-        if other_value is NotImplemented:
-            return NotImplemented
-        for flag in self, other:
-            if self._get_value(flag) is None:
-                raise TypeError("'%s' cannot be combined with other flags with |" % (flag, ))
-        value = self._value_
-        return self.__class__(value | other_value)
+    if type(other) is self.__class__:
+        # members of the same class: skip the type checks and, if the result
+        # is already known, the trip through the class call
+        try:
+            value = self._value_ | other._value_
+        except TypeError:
+            pass
+        else:
+            member = self._value2member_map_.get(value)
+            if member is not None:
+                return member
+            return self.__class__(value)
+    other_value = self._get_value(other)
+    if other_value is NotImplemented:
+        return NotImplemented
+    for flag in self, other:
+        if self._get_value(flag) is None:
+            raise TypeError("'%s' cannot be combined with other flags with |" % (flag, ))
+    value = self._value_
+    return self.__class__(value | other_value)
 
 @flag_dict
 def __and__(self, other):
+    if type(other) is self.__class__:
+        try:
+            value = self._value_ & other._value_
+        except TypeError:
+            pass
+        else:
+            member = self._value2member_map_.get(value)
+            if member is not None:
+                return member
+            return self.__class__(value)
     other_value = self._get_value(other)
     if other_value is NotImplemented:
         return NotImplemented
@@ -3176,6 +4058,16 @@ def __and__(self, other):
 
 @flag_dict
 def __xor__(self, other):
+    if type(other) is self.__class__:
+        try:
+            value = self._value_ ^ other._value_
+        except TypeError:
+            pass
+        else:
+            member = self._value2member_map_.get(value)
+            if member is not None:
+                return member
+            return self.__class__(value)
     other_value = self._get_value(other)
     if other_value is NotImplemented:
         return NotImplemented
@@ -3198,6 +4090,7 @@ flag_dict['__rand__'] = __and__
 flag_dict['__rxor__'] = __xor__
 
 Flag = EnumType('Flag', _flag_bases, flag_dict.resolve())
+_readonly_gnv.add(Flag.__dict__['_generate_next_value_'].__func__)
 del(flag_dict)
 
 # IntFlag
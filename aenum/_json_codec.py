@@ -0,0 +1,221 @@
+from ._common import *
+from ._enum import Enum, Flag
+from ._tuple import NamedTupleMeta
+import json
+
+__all__ = [
+        'EnumJSONEncoder', 'EnumJSONDecoder',
+        ]
+
+
+def _check_policy(name, policy, choices):
+    if policy not in choices:
+        raise ValueError('%s must be one of %s, not %r' % (
+                name, ', '.join([repr(c) for c in choices]), policy,
+                ))
+
+
+class EnumJSONEncoder(json.JSONEncoder):
+    """
+    JSON encoder for data holding Enum and Flag members and NamedTuples.
+
+    enum_as:        'value' or 'name'
+    flag_as:        'value' (the int) or 'values' (a list of the values of
+                    the canonical members)
+    namedtuple_as:  'object' (field names as keys) or 'array'
+
+    Mixed-in members (IntEnum, StrEnum, ...) and NamedTuples are ints, strs
+    and tuples to the json module, so it never asks default() about them;
+    the data is converted first instead, with a converter looked up once per
+    type.  Other keyword arguments are passed to json.JSONEncoder.
+    """
+
+    def __init__(self, enum_as='value', flag_as='value', namedtuple_as='object', **kwds):
+        _check_policy('enum_as', enum_as, ('value', 'name'))
+        _check_policy('flag_as', flag_as, ('value', 'values'))
+        _check_policy('namedtuple_as', namedtuple_as, ('object', 'array'))
+        super(EnumJSONEncoder, self).__init__(**kwds)
+        self.enum_as = enum_as
+        self.flag_as = flag_as
+        self.namedtuple_as = namedtuple_as
+        self._converters = {}
+
+    def encode(self, o):
+        if isinstance(o, basestring):
+            # json.JSONEncoder.encode() writes strings (so StrEnum members)
+            # itself, without going through iterencode()
+            o = self.convert(o)
+        return super(EnumJSONEncoder, self).encode(o)
+
+    def iterencode(self, o, _one_shot=False):
+        # encode() ends up here as well
+        return super(EnumJSONEncoder, self).iterencode(self.convert(o), _one_shot)
+
+    def convert(self, obj, _markers=None):
+        """
+        Return obj with its enum members and NamedTuples replaced by what
+        they are encoded as.
+        """
+        try:
+            converter = self._converters[type(obj)]
+        except KeyError:
+            converter = self._converters[type(obj)] = self._converter_for(type(obj))
+        if converter is None:
+            return obj
+        return converter(obj, _markers)
+
+    def _converter_for(self, cls):
+        """
+        Return the function that converts instances of cls, or None if json
+        can take them as they are.
+        """
+        convert = self.convert
+        if issubclass(cls, Flag):
+            if self.flag_as == 'value':
+                return lambda member, markers: member._value_
+            return lambda member, markers: [m._value_ for m in member]
+        elif issubclass(cls, Enum):
+            if self.enum_as == 'value':
+                return lambda member, markers: member._value_
+            return lambda member, markers: member._name_
+        elif isinstance(cls, NamedTupleMeta):
+            if self.namedtuple_as == 'object':
+                fields = cls._fields_
+                return self._container(
+                        lambda nt, markers: dict(zip(fields, [convert(v, markers) for v in nt]))
+                        )
+            return self._container(lambda nt, markers: [convert(v, markers) for v in nt])
+        elif issubclass(cls, (list, tuple)):
+            return self._container(lambda items, markers: [convert(i, markers) for i in items])
+        elif issubclass(cls, dict):
+            return self._container(
+                    lambda mapping, markers: dict([
+                        (convert(k, markers), convert(v, markers))
+                        for k, v in mapping.items()
+                        ])
+                    )
+        return None
+
+    def _container(self, converter):
+        """
+        Return converter, checking for circular references first if
+        check_circular is set (as json.JSONEncoder does).
+        """
+        if not self.check_circular:
+            return converter
+        def checked(obj, markers):
+            if markers is None:
+                markers = set()
+            marker = id(obj)
+            if marker in markers:
+                raise ValueError('Circular reference detected')
+            markers.add(marker)
+            result = converter(obj, markers)
+            markers.remove(marker)
+            return result
+        return checked
+
+
+class EnumJSONDecoder(json.JSONDecoder):
+    """
+    JSON decoder that turns the values found at the paths in schema into
+    enum members and NamedTuples.
+
+    A path is the keys leading to the values, joined by dots; a * stands for
+    every item of an array (or every value of an object), and the empty path
+    is the document itself:
+
+        {'status': Status, 'rows.*': Row, 'rows.*.color': Color}
+
+    NamedTuples are made from objects or arrays, and the paths inside them
+    are converted first.  All the values found for a path are converted in
+    one batch; missing keys and nulls are left alone.
+
+    enum_as and flag_as are as for EnumJSONEncoder; other keyword arguments
+    are passed to json.JSONDecoder.
+    """
+
+    def __init__(self, schema, enum_as='value', flag_as='value', **kwds):
+        _check_policy('enum_as', enum_as, ('value', 'name'))
+        _check_policy('flag_as', flag_as, ('value', 'values'))
+        super(EnumJSONDecoder, self).__init__(**kwds)
+        self.enum_as = enum_as
+        self.flag_as = flag_as
+        paths = []
+        for path, cls in schema.items():
+            if not (isinstance(cls, NamedTupleMeta) or isinstance(cls, type) and issubclass(cls, Enum)):
+                raise TypeError('%r: %r is not an Enum or NamedTuple class' % (path, cls))
+            paths.append((path and path.split('.') or [], cls))
+        # deepest first, so NamedTuples are made from converted values
+        paths.sort(key=lambda pc: -len(pc[0]))
+        self._paths = paths
+
+    def decode(self, s, *args, **kwds):
+        return self.convert(super(EnumJSONDecoder, self).decode(s, *args, **kwds))
+
+    def convert(self, data):
+        """
+        Convert the values at the schema's paths in data (as returned by
+        json.loads()); containers are updated in place.
+        """
+        root = [data]
+        for path, cls in self._paths:
+            places = _find(root, path)
+            if not places:
+                continue
+            values = [container[key] for container, key in places]
+            for (container, key), value in zip(places, self._convert_many(cls, values)):
+                container[key] = value
+        return root[0]
+
+    def _convert_many(self, cls, values):
+        if isinstance(cls, NamedTupleMeta):
+            return cls._make_many(values)
+        elif issubclass(cls, Flag) and self.flag_as == 'values':
+            # one lookup for every listed value, then one for the combined values
+            members = iter(cls.lookup_many([v for group in values for v in group]))
+            combined = []
+            for group in values:
+                value = 0
+                for _ in group:
+                    value |= next(members)._value_
+                combined.append(value)
+            return cls.lookup_many(combined)
+        elif issubclass(cls, Flag) or self.enum_as == 'value':
+            return cls.lookup_many(values)
+        else:
+            members = cls._member_map_
+            try:
+                return [members[name] for name in values]
+            except (KeyError, TypeError):
+                pass
+            for name in values:
+                if not isinstance(name, basestring) or name not in members:
+                    raise ValueError('%r is not a valid %s name' % (name, cls.__name__))
+
+
+def _find(root, path):
+    """
+    Return the (container, key) pairs of the non-null values at path.
+    """
+    places = [(root, 0)]
+    for step in path:
+        found = []
+        if step == '*':
+            for container, key in places:
+                node = container[key]
+                if isinstance(node, list):
+                    found.extend([(node, index) for index in range(len(node))])
+                elif isinstance(node, dict):
+                    found.extend([(node, name) for name in node])
+        else:
+            index = int(step) if step.isdigit() else None
+            for container, key in places:
+                node = container[key]
+                if isinstance(node, dict):
+                    if step in node:
+                        found.append((node, step))
+                elif isinstance(node, list) and index is not None and index < len(node):
+                    found.append((node, index))
+        places = found
+    return [(container, key) for container, key in places if container[key] is not None]
@@ -1,9 +1,23 @@
 from ._common import *
 from ._constant import NamedConstant
+from operator import itemgetter as _itemgetter
+import array as _array
+import struct as _struct
 import sys as _sys
 
+try:
+    import copyreg as _copyreg
+except ImportError:
+    # python 2
+    import copy_reg as _copyreg
+
+try:
+    from _collections import _tuplegetter
+except ImportError:
+    _tuplegetter = None
+
 __all__ = [
-        'TupleSize', 'NamedTuple',
+        'TupleSize', 'NamedTuple', 'NamedTupleTable',
         ]
 
 # NamedTuple
@@ -26,7 +40,7 @@ class NamedTupleDict(OrderedDict):
         Single underscore (sunder) names are reserved.
         """
         if is_sunder(key):
-            if key not in ('_size_', '_order_', '_fields_', '_review_'):
+            if key not in ('_size_', '_order_', '_fields_', '_review_', '_struct_'):
                 raise ValueError(
                         '_sunder_ names, such as %r, are reserved for future NamedTuple use'
                         % (key, )
@@ -66,6 +80,207 @@ class _TupleAttributeAtIndex(object):
         return '%s(%d)' % (self.__class__.__name__, self.index)
 
 
+class _TupleAttributeFixed(bltin_property):
+    # field of a fixed-size NamedTuple whose instances always have the value;
+    # the length check is not needed, so reads stay in C (property calling the
+    # tuple getter stdlib namedtuple uses, or an itemgetter)
+    # (no docstring: it would be reported as the field's)
+
+    def __init__(self, name, index, doc, default):
+        if doc is undefined:
+            doc = None
+        if _tuplegetter is not None:
+            getter = _tuplegetter(index, None).__get__
+        else:
+            getter = _itemgetter(index)
+        super(_TupleAttributeFixed, self).__init__(getter)
+        self.__doc__ = doc
+        self.name = name
+        self.index = index
+        self.default = default
+
+    def __repr__(self):
+        return '%s(%d)' % (self.__class__.__name__, self.index)
+
+
+# specialized constructors
+#
+# a NamedTuple that does not customize __new__ nor _review_ gets a __new__
+# written for its fields; calls it cannot handle directly (extra positional
+# arguments, positional and keyword arguments together, aliases, unknown
+# keywords, missing values) are passed on to the generic NamedTuple.__new__
+# so the results and errors stay the same; so are calls for any other class,
+# such as a subclass that adds fields and reaches it through super().__new__
+
+def _generate_new(namedtuple_class):
+    """
+    return a __new__ for namedtuple_class's fields, or None
+    """
+    fields = namedtuple_class._fields_
+    if not fields or namedtuple_class._defined_len_ != len(fields):
+        return None
+    for name in ('__new__', '_review_'):
+        for base in namedtuple_class.__mro__:
+            if name in base.__dict__:
+                break
+        if base is not NamedTuple and not getattr(base.__dict__[name].__get__(None, base), '_generated_', False):
+            return None
+    for index, field in enumerate(fields):
+        if getattr(namedtuple_class, field).index != index:
+            return None
+    defaults = namedtuple_class._defaults_
+    namespace = {
+            '_undefined_': undefined, '_generic_': _generic_new, '_tuple_new_': tuple.__new__,
+            '_tails_': _default_tails(defaults), '_fields_': frozenset(fields),
+            '_owner_': namedtuple_class,
+            }
+    source = [
+            'def __new__(_cls_, *_args_, **_kwds_):',
+            '    if _cls_ is not _owner_:',
+            '        return _generic_(_cls_, _args_, _kwds_)',
+            '    if not _kwds_:',
+            '        if len(_args_) < %d:' % len(fields),
+            '            tail = _tails_[len(_args_)]',
+            '            if tail is not None:',
+            '                return _tuple_new_(_cls_, _args_ + tail)',
+            '        elif len(_args_) == %d:' % len(fields),
+            '            return _tuple_new_(_cls_, _args_)',
+            '        return _generic_(_cls_, _args_, _kwds_)',
+            '    if _args_ or not _fields_.issuperset(_kwds_):',
+            '        return _generic_(_cls_, _args_, _kwds_)',
+            ]
+    required = []
+    for index, (field, default) in enumerate(zip(fields, defaults)):
+        if default is undefined:
+            source.append('    _%d_ = _kwds_.get(%r, _undefined_)' % (index, field))
+            required.append('_%d_ is _undefined_' % index)
+        else:
+            namespace['_default_%d_' % index] = default
+            source.append('    _%d_ = _kwds_.get(%r, _default_%d_)' % (index, field, index))
+    if required:
+        source.append('    if %s:' % ' or '.join(required))
+        source.append('        return _generic_(_cls_, _args_, _kwds_)')
+    source.append('    return _tuple_new_(_cls_, (%s, ))' % ', '.join(['_%d_' % i for i in range(len(fields))]))
+    exec('\n'.join(source), namespace)
+    new = namespace['__new__']
+    new._generated_ = True
+    return new
+
+def _default_tails(defaults):
+    """
+    tails[n] completes n positional values, if every later field has a default
+    """
+    tails = []
+    for n in range(len(defaults) + 1):
+        tail = tuple(defaults[n:])
+        tails.append(None if undefined in tail else tail)
+    return tails
+
+def _fill_defaults(cls, final_args):
+    """
+    replace undefined values in final_args with field defaults
+
+    Raises TypeError if required values are missing (some may be left off the
+    end of a variable-size tuple).
+    """
+    missing = []
+    for index, value in enumerate(final_args):
+        if value is undefined:
+            # look for default values
+            default = cls._defaults_[index]
+            if default is undefined:
+                missing.append(cls.__fields__[index])
+            else:
+                final_args[index] = default
+    if missing:
+        if cls._size_ in (TupleSize.fixed, TupleSize.minimum):
+            raise TypeError('values not provided for field(s): %s' % ', '.join(missing))
+        while final_args and final_args[-1] is undefined:
+            final_args.pop()
+            missing.pop()
+        if cls._size_ is not TupleSize.variable or undefined in final_args:
+            raise TypeError('values not provided for field(s): %s' % ', '.join(missing))
+    return final_args
+
+def _generic_new(cls, args, kwds):
+    """
+    call the generic NamedTuple.__new__ for a specialized one
+    """
+    return NamedTuple.__dict__['__new__'].__get__(None, cls)(cls, *args, **kwds)
+
+
+# struct packing
+#
+# _struct_ is either a complete struct format, or a mapping of field name to
+# that field's format (or to a (format, enum class) pair, so the field packs
+# as the member's value and unpacks through the enumeration's value lookup);
+# the class ends up with the compiled struct.Struct in _struct_
+
+def _compile_struct(namedtuple_class, spec):
+    """
+    return a struct.Struct and the enum class (or None) of each field
+    """
+    fields = namedtuple_class._fields_
+    name = namedtuple_class.__name__
+    if namedtuple_class._size_ is not TupleSize.fixed or namedtuple_class._defined_len_ != len(fields):
+        raise TypeError('%s: _struct_ needs a fixed-size NamedTuple without gaps' % (name, ))
+    enums = [None] * len(fields)
+    if isinstance(spec, basestring):
+        format = spec
+    else:
+        codes = [None] * len(fields)
+        for field, code in spec.items():
+            descriptor = namedtuple_class.__dict__.get(field)
+            if not isinstance(descriptor, (_TupleAttributeAtIndex, _TupleAttributeFixed)):
+                raise ValueError('%s has no field %r' % (name, field))
+            if isinstance(code, tuple):
+                code, enums[descriptor.index] = code
+            codes[descriptor.index] = code
+        missing = [f for f, c in zip(fields, codes) if c is None]
+        if missing:
+            raise TypeError('%s: no _struct_ format for field(s): %s' % (name, ', '.join(missing)))
+        format = ''.join(codes)
+        if format[0] not in '@=<>!':
+            # standard sizes, no padding
+            format = '=' + format
+    try:
+        compiled = _struct.Struct(format)
+    except _struct.error:
+        exc = _sys.exc_info()[1]
+        raise TypeError('%s: invalid _struct_ format %r: %s' % (name, format, exc))
+    count = len(compiled.unpack_from(bytearray(compiled.size)))
+    if count != len(fields):
+        raise TypeError('%s: _struct_ format %r has %d values for %d fields' % (name, format, count, len(fields)))
+    return compiled, tuple(enums)
+
+def _enum_decoder(enum_class):
+    """
+    return a function that turns a value into a member of enum_class
+    """
+    lookup = enum_class._value2member_map_.get
+    def decode(value):
+        member = lookup(value)
+        if member is None:
+            member = enum_class(value)
+        return member
+    return decode
+
+def _struct_records(cls, records):
+    """
+    yield an instance of cls for each tuple of unpacked values in records
+    """
+    decoders = [None if e is None else _enum_decoder(e) for e in cls._struct_enums_]
+    if getattr(cls.__new__, '_generated_', False):
+        # nothing to check: the struct gives exactly one value per field
+        new = tuple.__new__
+    else:
+        new = lambda cls, values: cls(*values)
+    if not any(decoders):
+        for values in records:
+            yield new(cls, values)
+    else:
+        for values in records:
+            yield new(cls, tuple([d(v) if d else v for d, v in zip(decoders, values)]))
 
 
 class TupleSize(NamedConstant):
@@ -229,6 +444,32 @@ class NamedTupleMeta(type):
         namedtuple_class._fields_ = fields
         namedtuple_class._aliases_ = aliases
         namedtuple_class._defined_len_ = max_len
+        namedtuple_class._defaults_ = tuple([offsets[f][2] for f in fields])
+        if clsdict.get('_struct_') is not None:
+            namedtuple_class._struct_, namedtuple_class._struct_enums_ = _compile_struct(
+                    namedtuple_class, clsdict['_struct_'],
+                    )
+        elif getattr(namedtuple_class, '_struct_', None) is not None:
+            # an inherited format only fits if the fields are the same
+            for base in namedtuple_class.__mro__[1:]:
+                if '_struct_' in base.__dict__:
+                    break
+            if base._fields_ != fields:
+                namedtuple_class._struct_ = namedtuple_class._struct_enums_ = None
+        else:
+            namedtuple_class._struct_ = namedtuple_class._struct_enums_ = None
+        new = _generate_new(namedtuple_class)
+        if new is not None:
+            namedtuple_class.__new__ = staticmethod(new)
+            if namedtuple_class._size_ is TupleSize.fixed:
+                # every instance has every field
+                for name, (index, doc, default) in offsets.items():
+                    setattr(namedtuple_class, name, _TupleAttributeFixed(name, index, doc, default))
+        elif getattr(namedtuple_class.__new__, '_generated_', False):
+            # the inherited __new__ was written for a base class that had no
+            # _review_, etc.; fall back to the generic one (the fields already
+            # have _TupleAttributeAtIndex descriptors from above)
+            namedtuple_class.__new__ = NamedTuple.__dict__['__new__']
         return namedtuple_class
 
     @staticmethod
@@ -357,10 +598,7 @@ class NamedTupleMeta(type):
             return namedtuple_class
         else:
             # instantiate a subclass
-            namedtuple_instance = cls.__new__(cls, *args, **kwds)
-            if isinstance(namedtuple_instance, cls):
-                namedtuple_instance.__init__(*args, **kwds)
-            return namedtuple_instance
+            return super(NamedTupleMeta, cls).__call__(*args, **kwds)
 
     @bltin_property
     def __fields__(cls):
@@ -395,25 +633,7 @@ def __new__(cls, *args, **kwds):
             raise TypeError('field %s specified more than once' % field)
         final_args[index] = value
     cls._review_(final_args)
-    missing = []
-    for index, value in enumerate(final_args):
-        if value is undefined:
-            # look for default values
-            name = cls.__fields__[index]
-            default = getattr(cls, name).default
-            if default is undefined:
-                missing.append(name)
-            else:
-                final_args[index] = default
-    if missing:
-        if cls._size_ in (TupleSize.fixed, TupleSize.minimum):
-            raise TypeError('values not provided for field(s): %s' % ', '.join(missing))
-        while final_args and final_args[-1] is undefined:
-            final_args.pop()
-            missing.pop()
-        if cls._size_ is not TupleSize.variable or undefined in final_args:
-            raise TypeError('values not provided for field(s): %s' % ', '.join(missing))
-    return tuple.__new__(cls, tuple(final_args))
+    return tuple.__new__(cls, tuple(_fill_defaults(cls, final_args)))
 
 @namedtuple_dict
 def __getitem__(self, index):
@@ -424,7 +644,11 @@ def __getitem__(self, index):
 
 @namedtuple_dict
 def __reduce_ex__(self, proto):
-    return self.__class__, tuple(getattr(self, f) for f in self._fields_)
+    cls = self.__class__
+    if proto >= 2 and getattr(cls.__new__, '_generated_', False) and len(self) == len(cls._fields_):
+        # the values are the fields, and cls.__new__ takes them as they are
+        return _copyreg.__newobj__, (cls, ) + tuple(self)
+    return cls, tuple(getattr(self, f) for f in self._fields_)
 
 @namedtuple_dict
 def __repr__(self):
@@ -462,6 +686,119 @@ def _fields(self):
 def _make(cls, iterable, new=None, len=None):
     return cls.__new__(cls, *iterable)
 
+@namedtuple_dict
+@classmethod
+def _make_many(cls, rows):
+    """
+    Yield a new instance for each row in rows.
+
+    Rows are sequences of values, or mappings of field names to values.  The
+    class is examined once, not once per row; rows are read lazily, so any
+    iterable (a csv reader, a database cursor) can be used.
+    """
+    new = cls.__new__
+    if new is not NamedTuple.__new__ and not getattr(new, '_generated_', False):
+        # a custom __new__ sees every row
+        for row in rows:
+            if hasattr(row, 'keys'):
+                yield cls(**row)
+            else:
+                yield cls(*row)
+        return
+    fields = cls._fields_
+    length = len(fields)
+    positions = dict([(name, getattr(cls, name).index) for name in fields + cls._aliases_])
+    tails = _default_tails(cls._defaults_)
+    fixed = cls._size_ is TupleSize.fixed
+    review = cls._review_
+    if getattr(review, '__func__', review) is NamedTuple._review_.__func__:
+        review = None
+    tuple_new = tuple.__new__
+    for row in rows:
+        if hasattr(row, 'keys'):
+            if review is None:
+                # the generated __new__ handles keywords directly
+                yield new(cls, **row)
+                continue
+            final_args = [undefined] * length
+            for name, value in row.items():
+                index = positions.get(name)
+                if index is None or final_args[index] is not undefined:
+                    final_args = None
+                    break
+                final_args[index] = value
+            if final_args is None:
+                # unknown or repeated field -- let __new__ report it
+                yield cls(**row)
+                continue
+        else:
+            if not isinstance(row, tuple):
+                row = tuple(row)
+            count = len(row)
+            if count > length and fixed:
+                yield cls(*row)
+                continue
+            if review is None:
+                if count == length:
+                    yield tuple_new(cls, row)
+                    continue
+                elif count < length and tails[count] is not None:
+                    yield tuple_new(cls, row + tails[count])
+                    continue
+            final_args = list(row) + [undefined] * (length - count)
+        if review is not None:
+            review(final_args)
+        yield tuple_new(cls, tuple(_fill_defaults(cls, final_args)))
+
+@namedtuple_dict
+def _pack(self):
+    """
+    Return the values packed with the class's `_struct_` format.
+    """
+    cls = self.__class__
+    if cls._struct_ is None:
+        raise TypeError('%s has no _struct_ format' % (cls.__name__, ))
+    enums = cls._struct_enums_
+    if not any(enums):
+        return cls._struct_.pack(*self)
+    return cls._struct_.pack(*[
+            v._value_ if e is not None and isinstance(v, e) else v
+            for e, v in zip(enums, self)
+            ])
+
+@namedtuple_dict
+@classmethod
+def _unpack(cls, buffer, offset=0):
+    """
+    Create an instance from the `_struct_` record at offset in buffer.
+    """
+    if cls._struct_ is None:
+        raise TypeError('%s has no _struct_ format' % (cls.__name__, ))
+    values = cls._struct_.unpack_from(buffer, offset)
+    if not any(cls._struct_enums_) and getattr(cls.__new__, '_generated_', False):
+        return tuple.__new__(cls, values)
+    return next(_struct_records(cls, [values]))
+
+@namedtuple_dict
+@classmethod
+def _iter_unpack(cls, buffer):
+    """
+    Yield an instance for each `_struct_` record in buffer (anything with the
+    buffer protocol -- bytes, bytearray, mmap, memoryview); the buffer is
+    read in place and its size must be a multiple of the record size.
+    """
+    compiled = cls._struct_
+    if compiled is None:
+        raise TypeError('%s has no _struct_ format' % (cls.__name__, ))
+    if hasattr(compiled, 'iter_unpack'):
+        records = compiled.iter_unpack(buffer)
+    else:
+        size = compiled.size
+        if len(buffer) % size:
+            raise _struct.error('iterative unpacking requires a buffer of a multiple of %d bytes' % size)
+        records = (compiled.unpack_from(buffer, offset) for offset in range(0, len(buffer), size))
+    return _struct_records(cls, records)
+
 @namedtuple_dict
 def _asdict(self):
     return OrderedDict(zip(self._fields_, self))
@@ -482,3 +819,178 @@ del namedtuple_dict
 
 
 
+
+
+# NamedTupleTable
+
+class NamedTupleTable(object):
+    """
+    Rows of one fixed-size NamedTuple, stored one column per field.
+
+    Fields named in `types` (field name or alias -> `array` typecode) are kept
+    in an `array.array`, everything else in a list.  Indexing with an integer
+    gives a lightweight row view, with a slice a new table, and with a field
+    name or alias that field's column.
+    """
+
+    def __init__(self, namedtuple_class, rows=(), types=None):
+        if not isinstance(namedtuple_class, NamedTupleMeta) or not namedtuple_class._fields_:
+            raise TypeError('%r is not a NamedTuple with fields' % (namedtuple_class, ))
+        fields = namedtuple_class._fields_
+        if (
+                namedtuple_class._size_ is not TupleSize.fixed
+                or namedtuple_class._defined_len_ != len(fields)
+            ):
+            raise TypeError('%s: only fixed-size NamedTuples without gaps can be stored in a table'
+                    % (namedtuple_class.__name__, ))
+        self.namedtuple_class = namedtuple_class
+        self._positions = dict([
+                (name, getattr(namedtuple_class, name).index)
+                for name in fields + namedtuple_class._aliases_
+                ])
+        typecodes = [None] * len(fields)
+        for name, typecode in (types or {}).items():
+            if name not in self._positions:
+                raise ValueError('%s has no field %r' % (namedtuple_class.__name__, name))
+            typecodes[self._positions[name]] = typecode
+        self._typecodes = typecodes
+        self._columns = [
+                list() if typecode is None else _array.array(typecode)
+                for typecode in typecodes
+                ]
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield _TableRow(self, index)
+
+    def __getitem__(self, index):
+        if isinstance(index, basestring):
+            return self._columns[self._position(index)]
+        elif isinstance(index, slice):
+            table = self._empty()
+            table._columns = [column[index] for column in self._columns]
+            return table
+        else:
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError('table index out of range')
+            return _TableRow(self, index)
+
+    def __repr__(self):
+        return '%s(%s, [%s])' % (
+                self.__class__.__name__,
+                self.namedtuple_class.__name__,
+                ', '.join([repr(row) for row in self]),
+                )
+
+    def _empty(self):
+        table = self.__class__.__new__(self.__class__)
+        table.namedtuple_class = self.namedtuple_class
+        table._positions = self._positions
+        table._typecodes = self._typecodes
+        return table
+
+    def _position(self, name):
+        try:
+            return self._positions[name]
+        except KeyError:
+            raise KeyError('%s has no field %r' % (self.namedtuple_class.__name__, name))
+
+    def append(self, row):
+        """
+        Add one row (a NamedTuple, a sequence of values, or a mapping of field
+        names to values).
+        """
+        self.extend((row, ))
+
+    def extend(self, rows):
+        """
+        Add rows; if any row is invalid none of them are added.
+        """
+        namedtuple_class = self.namedtuple_class
+        if isinstance(rows, NamedTupleTable) and rows.namedtuple_class is namedtuple_class:
+            # already validated (and copied first, in case it is this table)
+            rows = list(zip(*rows._columns)) if rows is self else zip(*rows._columns)
+        else:
+            rows = namedtuple_class._make_many(rows)
+        columns = self._columns
+        appends = [column.append for column in columns]
+        start = len(self)
+        try:
+            for row in rows:
+                for append, value in zip(appends, row):
+                    append(value)
+        except Exception:
+            # put every column back to the same length
+            for column in columns:
+                del column[start:]
+            raise
+
+    def instances(self):
+        """
+        Yield each row as a new NamedTuple.
+        """
+        new = tuple.__new__
+        namedtuple_class = self.namedtuple_class
+        for values in zip(*self._columns):
+            yield new(namedtuple_class, values)
+
+
+class _TableRow(object):
+    """
+    A row of a NamedTupleTable; reads go to the table's columns.
+    """
+
+    __slots__ = '_table', '_index'
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getattr__(self, name):
+        table = self._table
+        try:
+            position = table._positions[name]
+        except KeyError:
+            raise AttributeError('%s row has no field %r' % (table.namedtuple_class.__name__, name))
+        return table._columns[position][self._index]
+
+    def __getitem__(self, index):
+        if isinstance(index, basestring):
+            return getattr(self, index)
+        return tuple(self)[index]
+
+    def __len__(self):
+        return len(self._table._columns)
+
+    def __iter__(self):
+        index = self._index
+        for column in self._table._columns:
+            yield column[index]
+
+    def __eq__(self, other):
+        return tuple(self) == other
+
+    def __ne__(self, other):
+        return tuple(self) != other
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return '%s(%s)' % (
+                self._table.namedtuple_class.__name__,
+                ', '.join(['%s=%r' % (f, v) for f, v in zip(self._table.namedtuple_class._fields_, self)]),
+                )
+
+    @bltin_property
+    def _fields(self):
+        return list(self._table.namedtuple_class._fields_)
+
+    def _asdict(self):
+        return OrderedDict(zip(self._table.namedtuple_class._fields_, self))
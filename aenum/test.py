@@ -4,21 +4,27 @@ from __future__ import division, print_function
 import sys
 import aenum
 import doctest
+import gc
+import json
 import os
 import shutil
+import struct
 import tempfile
 import textwrap
 import unittest
 import uuid
 import warnings
+import weakref
 from aenum import EnumType, EnumMeta, Enum, IntEnum, StrEnum, LowerStrEnum, UpperStrEnum, ReprEnum
 from aenum import AutoNumberEnum, MultiValueEnum, OrderedEnum, UniqueEnum, AddValueEnum, Flag, IntFlag
-from aenum import NamedTuple, TupleSize, NamedConstant, constant, NoAlias, AddValue, Unique
+from aenum import NamedTuple, NamedTupleTable, TupleSize, NamedConstant, constant, NoAlias, AddValue, Unique
 from aenum import STRICT, CONFORM, EJECT, KEEP
-from aenum import _reduce_ex_by_name, unique, skip, extend_enum, auto, enum, MultiValue, member, nonmember, no_arg
-from aenum import basestring, baseinteger, unicode, enum_property
+from aenum import EnumJSONEncoder, EnumJSONDecoder, EnumSet, EnumMap
+from aenum import _reduce_ex_by_name, pickle_by_definition, unique, skip, extend_enum, extend_enum_many, auto, enum, MultiValue, member, nonmember, no_arg
+from aenum import basestring, baseinteger, unicode, enum_property, undefined
 from aenum import pyver, PY2, PY3, PY2_6, PY3_3, PY3_4, PY3_5, PY3_6, PY3_7, PY3_11
-from aenum._enum import _high_bit
+from aenum._enum import _high_bit, bit_count
+from aenum._tuple import _TupleAttributeAtIndex
 from collections import OrderedDict
 from datetime import timedelta
 from pickle import dumps, loads, PicklingError, HIGHEST_PROTOCOL
@@ -34,6 +40,18 @@ try:
 except ImportError:
     threading = None
 
+try:
+    import numpy
+    from aenum import EnumArray, FlagArray
+except ImportError:
+    numpy = None
+
+try:
+    import sqlite3
+    from aenum import register_sqlite
+except ImportError:
+    sqlite3 = None
+
 try:
     any
 except NameError:
@@ -1070,19 +1088,49 @@ class TestEnum(TestCase):
                 (2, 'please ==take notice==', '==', '=='),
                 )
 
-    def test_members_is_ordereddict_if_ordered(self):
+    def test_members_is_ordered_if_ordered(self):
         class Ordered(Enum):
             __order__ = 'first second third'
             first = 'bippity'
             second = 'boppity'
             third = 'boo'
-        self.assertTrue(type(Ordered.__members__) is OrderedDict)
+        if PY2:
+            self.assertTrue(type(Ordered.__members__) is OrderedDict)
+        self.assertEqual(list(Ordered.__members__), ['first', 'second', 'third'])
 
-    def test_members_is_ordereddict_if_not_ordered(self):
+    def test_members_is_ordered_if_not_ordered(self):
         class Unordered(Enum):
             this = 'that'
             these = 'those'
-        self.assertTrue(type(Unordered.__members__) is OrderedDict)
+        if PY2:
+            self.assertTrue(type(Unordered.__members__) is OrderedDict)
+        self.assertEqual(list(Unordered.__members__), ['this', 'these'])
+
+    @unittest.skipIf(PY2, 'no MappingProxyType on Python 2')
+    def test_members_is_read_only_view(self):
+        class Color(Enum):
+            RED = 1
+            GREEN = 2
+        members = Color.__members__
+        self.assertIs(members, Color.__members__)
+        self.assertEqual(list(members.items()), [('RED', Color.RED), ('GREEN', Color.GREEN)])
+        with self.assertRaises(TypeError):
+            members['BLUE'] = 3
+        extend_enum(Color, 'BLUE', 3)
+        self.assertEqual(list(members), ['RED', 'GREEN', 'BLUE'])
+        self.assertIs(members['BLUE'], Color.BLUE)
+
+    def test_members_copy(self):
+        class CopyEnum(Enum):
+            _members_copy_ = True
+        class Color(CopyEnum):
+            RED = 1
+            GREEN = 2
+        members = Color.__members__
+        self.assertTrue(type(members) is OrderedDict)
+        self.assertIsNot(members, Color.__members__)
+        members['BLUE'] = 3
+        self.assertEqual(list(Color.__members__), ['RED', 'GREEN'])
 
     def test_enum_in_enum_out(self):
         Season = self.Season
@@ -1535,6 +1583,105 @@ class TestEnum(TestCase):
         test_pickle_dump_load(self.assertTrue, Question.who)
         test_pickle_dump_load(self.assertTrue, Question)
 
+    def test_copy(self):
+        import copy
+        if isinstance(Stooges, Exception):
+            raise Stooges
+        for member in (Stooges.CURLY, IntStooges.CURLY, FlagStooges.LARRY | FlagStooges.CURLY):
+            self.assertIs(copy.copy(member), member)
+            self.assertIs(copy.deepcopy(member), member)
+        config = {'stooges': [Stooges.MOE, IntStooges.LARRY], 'flags': (FlagStooges.CURLY, )}
+        copied = copy.deepcopy(config)
+        self.assertIsNot(copied['stooges'], config['stooges'])
+        self.assertIs(copied['stooges'][0], Stooges.MOE)
+        self.assertIs(copied['flags'][0], FlagStooges.CURLY)
+
+    def test_member_attributes_without_python_frames(self):
+        class Shadow(Enum):
+            value = 1
+            other = 2
+        calls = []
+        def profile(frame, event, arg):
+            if event == 'call':
+                calls.append(frame.f_code.co_name)
+        members = (Stooges.CURLY, IntStooges.LARRY, FlagStooges.LARRY | FlagStooges.CURLY)
+        sys.setprofile(profile)
+        try:
+            for member in members:
+                member.name
+                member.value
+        finally:
+            sys.setprofile(None)
+        self.assertEqual(calls, [])
+        self.assertEqual([(m.name, m.value) for m in members], [('CURLY', 2), ('LARRY', 1), ('LARRY|CURLY', 3)])
+        self.assertIs(Shadow.value, Shadow['value'])
+        self.assertEqual((Shadow.other.value, Shadow.value.value, Shadow.value.name), (2, 1, 'value'))
+        self.assertRaisesRegex(AttributeError, 'cannot set attribute', setattr, Shadow.other, 'name', 'x')
+
+    def test_member_attributes_not_on_class(self):
+        for enum in (Enum, Stooges, IntStooges, FlagStooges):
+            for name in ('name', 'value', 'values'):
+                self.assertFalse(hasattr(enum, name), '%r has %r' % (enum, name))
+                self.assertEqual(getattr(enum, name, 'default'), 'default')
+        self.assertRaisesRegex(AttributeError, 'cannot rebind property', setattr, Stooges, 'value', property())
+        self.assertRaisesRegex(AttributeError, 'cannot delete property', delattr, Stooges, 'name')
+        class Field(Enum):
+            _order_ = 'name value'
+            name = 1
+            value = 2
+        self.assertEqual(list(Field), [Field['name'], Field['value']])
+        self.assertIs(Field.name, Field['name'])
+        self.assertEqual((Field.value.value, Field.value.name), (2, 'value'))
+        self.assertNotIn('name', Field.__dict__)
+        self.assertFalse(hasattr(Field, 'values'))
+        extend_enum(Field, 'values', 3)
+        self.assertIs(Field.values, Field(3))
+        self.assertEqual(Field.values.values, (3, ))
+        class Base(Enum):
+            @property
+            def value(self):
+                return 'v%s' % self._value_
+        class Custom(Base):
+            a = 1
+        self.assertEqual(Custom.a.value, 'v1')
+        self.assertIs(type(Custom.value), type(Base.__dict__['value']))
+
+    def test_hash_and_equality(self):
+        class Color(Enum):
+            _order_ = 'red green crimson'
+            red = 1
+            green = 2
+            crimson = 1
+            @classmethod
+            def _missing_(cls, value):
+                pseudo_member = object.__new__(cls)
+                pseudo_member._name_ = 'unknown'
+                pseudo_member._value_ = value
+                return pseudo_member
+        class Perm(Flag):
+            _order_ = 'R W'
+            R = 4
+            W = 2
+        class Number(IntEnum):
+            one = 1
+        self.assertEqual(hash(Color.red), hash('red'))
+        self.assertEqual(hash(Color.crimson), hash('red'))
+        self.assertEqual(hash(Color(7)), hash('unknown'))
+        self.assertEqual(hash(Perm.R|Perm.W), hash('R|W'))
+        self.assertEqual(hash(Number.one), hash(1))
+        extend_enum(Color, 'blue', 3)
+        self.assertEqual(hash(Color.blue), hash('blue'))
+        self.assertEqual(dict.fromkeys([Color.red, Color.blue])[Color.crimson], None)
+        self.assertTrue(Color.red == Color.crimson)
+        self.assertFalse(Color.red != Color.crimson)
+        self.assertTrue(Color.red != Color.green)
+        self.assertFalse(Color.red == 1)
+        self.assertTrue(Color.red != 1)
+        self.assertFalse(Color(7) == Color(7))
+        self.assertTrue(Number.one == 1)
+        self.assertFalse(Number.one != 1)
+        self.assertRaises(TypeError, lambda: Color.red < Color.green)
+
     def test_pickle_by_name(self):
         class ReplaceGlobalInt(IntEnum):
             ONE = 1
@@ -1543,6 +1690,64 @@ class TestEnum(TestCase):
         for proto in range(HIGHEST_PROTOCOL):
             self.assertEqual(ReplaceGlobalInt.TWO.__reduce_ex__(proto), 'TWO')
 
+    def test_pickle_by_definition(self):
+        def load_from_database():
+            return [('new', 1), ('open', 2), ('closed', 3), ('done', 3)]
+        Status = Enum('Status', load_from_database(), module=None)
+        # not a module global, so it cannot be found by name
+        test_pickle_exception(self.assertRaises, PicklingError, Status, protocol=(2, HIGHEST_PROTOCOL))
+        Status = pickle_by_definition(Status)
+        test_pickle_dump_load(self.assertIs, Status.open)
+        test_pickle_dump_load(self.assertIs, Status)
+        # an identical definition gives the class already registered
+        self.assertIs(pickle_by_definition(Enum('Status', load_from_database())), Status)
+        # a process that has not seen the definition builds it once
+        data = dumps([Status.open, Status.done], protocol=2)
+        del aenum._enum._definitions[Status._definition_[0]]
+        first = loads(data)
+        second = loads(dumps(Status.new, protocol=2))
+        Rebuilt = type(first[0])
+        self.assertIsNot(Rebuilt, Status)
+        self.assertEqual(Rebuilt.__name__, 'Status')
+        self.assertEqual([m.name for m in Rebuilt], ['new', 'open', 'closed'])
+        self.assertEqual(first, [Rebuilt.open, Rebuilt.closed])
+        self.assertIs(second, Rebuilt.new)
+        self.assertIs(Rebuilt.done, Rebuilt.closed)
+        self.assertIs(loads(dumps(Rebuilt)), Rebuilt)
+
+    def test_pickle_by_definition_flag_and_namedtuple(self):
+        Perm = pickle_by_definition(Flag('Perm', 'R W X', boundary=KEEP))
+        Row = pickle_by_definition(NamedTuple('Row', [('id', 0), ('perm', (1, 'permissions', Perm.R))]))
+        data = dumps(Row(7, Perm.R | Perm.X), protocol=2)
+        aenum._enum._definitions.clear()
+        row = loads(data)
+        NewRow, NewPerm = type(row), type(row.perm)
+        self.assertIsNot(NewRow, Row)
+        self.assertIsNot(NewPerm, Perm)
+        self.assertEqual(row.id, 7)
+        self.assertEqual(row.perm, NewPerm.R | NewPerm.X)
+        self.assertIs(NewPerm._boundary_, KEEP)
+        self.assertIs(NewRow(1).perm, NewPerm.R)
+        self.assertEqual(NewRow.perm.__doc__, 'permissions')
+
+    def test_pickle_by_definition_not_kept(self):
+        Shade = pickle_by_definition(Enum('Shade', 'light dark', module=None))
+        digest = Shade._definition_[0]
+        self.assertIs(loads(dumps(Shade.dark, protocol=2)), Shade.dark)
+        ref = weakref.ref(Shade)
+        del Shade
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertNotIn(digest, aenum._enum._definitions)
+
+    def test_pickle_by_definition_invalid(self):
+        class Color(Enum):
+            red = 1
+            def describe(self):
+                return self.name
+        self.assertRaisesRegex(TypeError, 'without methods', pickle_by_definition, Color)
+        self.assertRaisesRegex(TypeError, 'not an Enum or NamedTuple', pickle_by_definition, int)
+
     def test_exploding_pickle(self):
         BadPickle = Enum('BadPickle', 'dill sweet bread-n-butter')
         aenum.make_class_unpicklable(BadPickle)
@@ -4004,6 +4209,273 @@ class TestEnum(TestCase):
         self.assertEqual(Many.B.value, (4, 5, 3))
         self.assertEqual(Many.C.value, (4, 5, 6))
 
+    def test_unhashable_values_are_indexed(self):
+        class Config(Enum):
+            LIST = [1, 2, 3]
+            DICT = {'id': 1, 'values': [4, 5]}
+            SET = set([7, 8])
+            NESTED = ([1], {'a': [2]})
+            SAME = [1, 2, 3]
+        self.assertEqual(len(Config), 4)
+        self.assertIs(Config.SAME, Config.LIST)
+        self.assertIs(Config([1, 2, 3]), Config.LIST)
+        self.assertIs(Config({'values': [4, 5], 'id': 1}), Config.DICT)
+        self.assertIs(Config(set([8, 7])), Config.SET)
+        self.assertIs(Config(([1], {'a': [2]})), Config.NESTED)
+        self.assertIn([1, 2, 3], Config)
+        self.assertNotIn([3, 2, 1], Config)
+        self.assertNotIn({'id': 2}, Config)
+        self.assertRaisesRegex(ValueError, 'is not a valid', Config, [9])
+        self.assertEqual(len(Config._value2member_seq_), 5)
+        self.assertEqual(len(Config._value2member_idx_), 4)
+
+    def test_unhashable_values_without_key(self):
+        class Thing(object):
+            __hash__ = None
+            def __init__(self, value):
+                self.value = value
+            def __eq__(self, other):
+                if isinstance(other, Thing):
+                    return self.value == other.value
+                return self.value == other
+        class Things(Enum):
+            ONE = Thing(1)
+            LIST = [1]
+        self.assertIs(Things(Thing(1)), Things.ONE)
+        self.assertIs(Things([1]), Things.LIST)
+        self.assertIn(Thing(1), Things)
+        self.assertNotIn(Thing(2), Things)
+        self.assertIn(None, Things._value2member_idx_)
+
+    def test_register_value_key(self):
+        class Point(object):
+            __hash__ = None
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+            def __eq__(self, other):
+                return (self.x, self.y) == (other.x, other.y)
+        aenum.register_value_key(Point, lambda p: (p.x, p.y))
+        try:
+            class Corner(Enum):
+                ORIGIN = Point(0, 0)
+                FAR = Point(9, 9)
+            self.assertIs(Corner(Point(9, 9)), Corner.FAR)
+            self.assertIn((9, 9), Corner._value2member_idx_)
+            self.assertNotIn(None, Corner._value2member_idx_)
+        finally:
+            del aenum._enum._value_keys[Point]
+
+    def test_multivalue_unhashable_duplicate(self):
+        with self.assertRaisesRegex(ValueError, 'has already been used'):
+            class Lists(Enum):
+                _settings_ = MultiValue
+                ONE = [1], [2]
+                TWO = [3], [1]
+
+    def test_lookup_many(self):
+        class Color(Enum):
+            RED = 1
+            GREEN = 2
+            BLUE = 3
+            LIST = [4]
+        self.assertEqual(
+                Color.lookup_many([3, 1, Color.GREEN, [4], 1]),
+                [Color.BLUE, Color.RED, Color.GREEN, Color.LIST, Color.RED],
+                )
+        self.assertEqual(Color.lookup_many(iter(())), [])
+        self.assertRaisesRegex(ValueError, '7 is not a valid Color', Color.lookup_many, [1, 7])
+        self.assertEqual(Color.lookup_many([1, 7, [9], 2], errors='skip'), [Color.RED, Color.GREEN])
+        self.assertEqual(
+                Color.lookup_many([1, 7, [9], 2], default=Color.BLUE, errors='default'),
+                [Color.RED, Color.BLUE, Color.BLUE, Color.GREEN],
+                )
+        self.assertRaisesRegex(ValueError, 'errors must be', Color.lookup_many, [1], errors='ignore')
+
+    def test_lookup_many_calls_missing_once(self):
+        calls = []
+        class Color(Enum):
+            RED = 1
+            GREEN = 2
+            @classmethod
+            def _missing_value_(cls, value):
+                calls.append(value)
+                if value == 'red':
+                    return cls.RED
+        self.assertEqual(
+                Color.lookup_many(['red', 2, 'red', 'blue', 'red', 'blue'], errors='skip'),
+                [Color.RED, Color.GREEN, Color.RED, Color.RED],
+                )
+        self.assertEqual(calls, ['red', 'blue'])
+
+    def test_lookup_many_noalias(self):
+        class Color(Enum):
+            _settings_ = NoAlias
+            RED = 1
+            ROJO = 1
+        self.assertRaisesRegex(TypeError, 'NoAlias', Color.lookup_many, [1])
+
+    def test_dense_integer_lookup(self):
+        class Opcode(IntEnum):
+            NOP = 0
+            LOAD = 1
+            STORE = 2
+            JUMP = 4
+            HALT = 5
+            STOP = 5
+        self.assertEqual(
+                Opcode._value2member_dense_,
+                (0, [Opcode.NOP, Opcode.LOAD, Opcode.STORE, None, Opcode.JUMP, Opcode.HALT]),
+                )
+        self.assertIs(Opcode(5), Opcode.HALT)
+        self.assertIs(Opcode(True), Opcode.LOAD)
+        self.assertIs(Opcode(2.0), Opcode.STORE)
+        self.assertIn(4, Opcode)
+        self.assertNotIn(3, Opcode)
+        self.assertNotIn(-1, Opcode)
+        self.assertRaisesRegex(ValueError, '3 is not a valid Opcode', Opcode, 3)
+        self.assertRaisesRegex(ValueError, '6 is not a valid Opcode', Opcode, 6)
+        self.assertRaisesRegex(ValueError, '-1 is not a valid Opcode', Opcode, -1)
+        #
+        slots = Opcode._value2member_dense_[1]
+        extend_enum(Opcode, 'CALL', 3)
+        extend_enum(Opcode, 'RET', 6)
+        extend_enum(Opcode, 'YIELD', 9)
+        self.assertIs(Opcode(3), Opcode.CALL)
+        self.assertIs(Opcode(6), Opcode.RET)
+        self.assertIs(Opcode(9), Opcode.YIELD)
+        self.assertNotIn(8, Opcode)
+        self.assertIs(Opcode._value2member_dense_[1], slots)
+        self.assertEqual(len(slots), 10)
+
+    def test_dense_integer_lookup_offset(self):
+        class Opcode(IntEnum):
+            _order_ = 'PUSH POP DUP SWAP'
+            PUSH = 0x80
+            POP = 0x81
+            DUP = 0x82
+            SWAP = 0x84
+        self.assertEqual(
+                Opcode._value2member_dense_,
+                (0x80, [Opcode.PUSH, Opcode.POP, Opcode.DUP, None, Opcode.SWAP]),
+                )
+        self.assertIs(Opcode(0x84), Opcode.SWAP)
+        self.assertIn(0x81, Opcode)
+        self.assertNotIn(0x83, Opcode)
+        self.assertNotIn(0, Opcode)
+        self.assertNotIn(4, Opcode)
+        self.assertRaisesRegex(ValueError, '4 is not a valid Opcode', Opcode, 4)
+        self.assertRaisesRegex(ValueError, '133 is not a valid Opcode', Opcode, 0x85)
+        Status = Enum('Status', [('S%d' % v, v) for v in range(1000, 1011)])
+        self.assertEqual(Status._value2member_dense_[0], 1000)
+        self.assertIs(Status(1005), Status.S1005)
+        class Negative(Enum):
+            _order_ = 'DOWN LEVEL UP'
+            DOWN = -1
+            LEVEL = 0
+            UP = 1
+        self.assertEqual(Negative._value2member_dense_, (-1, [Negative.DOWN, Negative.LEVEL, Negative.UP]))
+        self.assertIs(Negative(-1), Negative.DOWN)
+
+    def test_dense_integer_lookup_extend(self):
+        Numbers = Enum('Numbers', [])
+        for value in range(100):
+            extend_enum(Numbers, 'N%d' % value, value)
+        self.assertEqual(Numbers._value2member_dense_, (0, list(Numbers)))
+        # below the table: dropped, then rebuilt once there are 128 values
+        extend_enum(Numbers, 'MINUS', -1)
+        self.assertEqual(Numbers._value2member_dense_, (0, []))
+        self.assertIs(Numbers(-1), Numbers.MINUS)
+        self.assertIs(Numbers(50), Numbers.N50)
+        for value in range(100, 127):
+            extend_enum(Numbers, 'N%d' % value, value)
+        self.assertEqual(Numbers._value2member_dense_[0], -1)
+        self.assertEqual(len(Numbers._value2member_dense_[1]), 128)
+        self.assertIs(Numbers(126), Numbers.N126)
+        # a value that is not an int drops the table for good
+        extend_enum(Numbers, 'TEXT', 'text')
+        self.assertEqual(Numbers._value2member_dense_, (0, []))
+        self.assertIs(Numbers('text'), Numbers.TEXT)
+        self.assertIs(Numbers(3), Numbers.N3)
+
+    def test_dense_integer_lookup_auto_number(self):
+        class Color(AutoNumberEnum):
+            _order_ = 'red green blue'
+            red = ()
+            green = ()
+            blue = ()
+        self.assertEqual(Color._value2member_dense_, (1, [Color.red, Color.green, Color.blue]))
+        self.assertIs(Color(3), Color.blue)
+        self.assertNotIn(0, Color)
+
+    def test_sparse_values_not_dense(self):
+        class Sparse(Enum):
+            LOW = 1
+            HIGH = 1000
+        self.assertEqual(Sparse._value2member_dense_, (0, []))
+        self.assertIs(Sparse(1000), Sparse.HIGH)
+        class Mixed(Enum):
+            ONE = 1
+            TWO = '2'
+        self.assertEqual(Mixed._value2member_dense_, (0, []))
+        self.assertIs(Mixed(1), Mixed.ONE)
+
+    def test_unique_setting_message(self):
+        with self.assertRaisesRegex(ValueError, r'Color: duplicate names found: red --> rojo \[1\]'):
+            class Color(Enum):
+                _order_ = 'red green rojo'
+                _settings_ = Unique
+                red = 1
+                green = 2
+                rojo = 1
+
+    def test_gnv_sees_all_last_values(self):
+        seen = []
+        class Color(Enum):
+            _order_ = 'red green blue'
+            def _generate_next_value_(name, start, count, last_values, *args, **kwds):
+                seen.append(list(last_values))
+                return (count + 1) * 10
+            red = auto()
+            green = 7
+            blue = auto()
+        self.assertEqual(seen, [[], [10, 7]])
+        self.assertEqual([m.value for m in Color], [10, 7, 30])
+
+    def test_gnv_cannot_change_last_values(self):
+        def clear_values(name, start, count, last_values, *args, **kwds):
+            value = len(last_values) * 10 + 1
+            del last_values[:]
+            return value
+        class Color(Enum):
+            _order_ = 'red green blue'
+            _generate_next_value_ = staticmethod(clear_values)
+            red = auto()
+            green = auto()
+            blue = auto()
+        self.assertEqual([m.value for m in Color], [1, 11, 21])
+        class Base(Enum):
+            _generate_next_value_ = staticmethod(clear_values)
+        Shade = Base('Shade', 'light medium dark')
+        self.assertEqual([m.value for m in Shade], [1, 11, 21])
+
+    def test_large_enums(self):
+        names = ['M%d' % i for i in range(5000)]
+        Big = Enum('Big', names)
+        self.assertEqual(len(Big), 5000)
+        self.assertIs(Big(5000), Big.M4999)
+        clsdict = EnumType.__prepare__('Numbered', (AutoNumberEnum, ))
+        for name in names:
+            clsdict[name] = ()
+        Numbered = EnumType('Numbered', (AutoNumberEnum, ), clsdict)
+        self.assertEqual([m.value for m in Numbered], list(range(1, 5001)))
+        clsdict = EnumType.__prepare__('Auto', (Enum, ))
+        clsdict['_order_'] = ' '.join(names)
+        for name in names:
+            clsdict[name] = auto()
+        Auto = EnumType('Auto', (Enum, ), clsdict)
+        self.assertEqual(Auto.M2500.value, 2501)
+
 
 class TestStrEnum(TestCase):
 
@@ -5475,6 +5947,159 @@ class TestFlag(TestCase):
         with self.assertRaisesRegex(TypeError, r"'FlagWithNoneMember.E' cannot be inverted"):
             ~FlagWithNoneMember.E
 
+    def test_operators_same_class(self):
+        class Color(Flag):
+            BLACK = 0
+            RED = 1
+            GREEN = 2
+            BLUE = 4
+            WHITE = 7
+        class Other(Flag):
+            RED = 1
+        self.assertTrue(Color.RED | Color.GREEN | Color.BLUE is Color.WHITE)
+        self.assertTrue(Color.WHITE & Color.RED is Color.RED)
+        self.assertTrue(Color.WHITE ^ Color.WHITE is Color.BLACK)
+        purple = Color.RED | Color.BLUE
+        self.assertEqual(purple.value, 5)
+        self.assertTrue(Color.BLUE | Color.RED is purple)
+        self.assertTrue(Color.WHITE ^ Color.GREEN is purple)
+        self.assertTrue(purple & Color.WHITE is purple)
+        for op in (_or_, _and_, _xor_):
+            self.assertRaises(TypeError, op, Color.RED, Other.RED)
+            self.assertRaises(TypeError, op, Color.RED, 1)
+
+    def test_iteration_is_cached(self):
+        class Color(Flag):
+            _order_ = 'RED GREEN BLUE'
+            RED = 1
+            GREEN = 4
+            BLUE = 2
+        white = Color(7)
+        self.assertEqual(list(white), [Color.RED, Color.GREEN, Color.BLUE])
+        self.assertEqual(white._decomposition_, (7, (Color.RED, Color.GREEN, Color.BLUE)))
+        self.assertEqual(list(white), [Color.RED, Color.GREEN, Color.BLUE])
+        self.assertEqual(len(white), 3)
+        self.assertEqual(list(Color.RED), [Color.RED])
+
+    def test_iteration_cache_after_extend(self):
+        class Perm(IntFlag):
+            _order_ = 'R W X'
+            R = 4
+            W = 2
+            X = 1
+        everything = Perm(15)
+        self.assertEqual(list(everything), [Perm.R, Perm.W, Perm.X])
+        extend_enum(Perm, 'S', 8)
+        self.assertEqual(list(everything), [Perm.R, Perm.W, Perm.X, Perm.S])
+        self.assertEqual(len(everything), 4)
+
+    def test_bit_count(self):
+        for value, count in ((0, 0), (1, 1), (6, 2), (255, 8), (2**70 + 5, 3)):
+            self.assertEqual(bit_count(value), count)
+
+    def test_pseudo_member_cache_unbounded(self):
+        class Color(Flag):
+            RED = 1
+            GREEN = 2
+            BLUE = 4
+        purple = Color.RED | Color.BLUE
+        self.assertTrue(Color._value2member_map_[5] is purple)
+        self.assertTrue(Color(5) is purple)
+        self.assertEqual(Color._pseudo_members_.created, 1)
+        self.assertEqual(Color._pseudo_members_.evicted, 0)
+
+    def test_pseudo_member_cache_lru(self):
+        class Color(Flag):
+            _pseudo_member_cache_ = 2
+            RED = 1
+            GREEN = 2
+            BLUE = 4
+        yellow = Color.RED | Color.GREEN
+        purple = Color.RED | Color.BLUE
+        self.assertTrue(Color(3) is yellow)
+        cyan = Color.GREEN | Color.BLUE
+        # purple was the least recently used
+        self.assertEqual(Color._pseudo_members_.created, 3)
+        self.assertEqual(Color._pseudo_members_.evicted, 1)
+        self.assertTrue(Color(3) is yellow)
+        self.assertTrue(Color(6) is cyan)
+        # but is still found while in use
+        self.assertTrue(Color(5) is purple)
+        self.assertEqual(Color._pseudo_members_.created, 3)
+        del purple, yellow, cyan
+        gc.collect()
+        Color(1) | Color(2) | Color(4)
+        self.assertEqual(len(Color._pseudo_members_._map), 2)
+        self.assertEqual(len(Color._pseudo_members_._retired._map), 0)
+        # canonical members are never evicted
+        self.assertEqual(sorted(Color._value2member_map_), [1, 2, 4])
+        self.assertTrue(Color(1) is Color.RED)
+        self.assertEqual(list(Color(7)), [Color.RED, Color.GREEN, Color.BLUE])
+
+    def test_pseudo_member_cache_weak(self):
+        class Color(Flag):
+            _pseudo_member_cache_ = 'weak'
+            RED = 1
+            GREEN = 2
+            BLUE = 4
+        purple = Color.RED | Color.BLUE
+        self.assertTrue(Color(5) is purple)
+        self.assertEqual(Color._pseudo_members_.created, 1)
+        del purple
+        gc.collect()
+        self.assertEqual(Color._pseudo_members_.evicted, 1)
+        self.assertEqual(Color(5).value, 5)
+        self.assertEqual(Color._pseudo_members_.created, 2)
+
+    @unittest.skipUnless(threading, 'Threading required for this test.')
+    def test_pseudo_member_cache_weak_unique_composite(self):
+        class TestFlag(Flag):
+            _pseudo_member_cache_ = 'weak'
+            _order_ = 'one two three four five six seven eight'
+            one = auto()
+            two = auto()
+            three = auto()
+            four = auto()
+            five = auto()
+            six = auto()
+            seven = auto()
+            eight = auto()
+            def __eq__(self, other):
+                return self is other
+            def __hash__(self):
+                return hash(self._value_)
+        # have multiple threads competing to complete the composite members
+        seen = set()
+        failed = [False]
+        def cycle_enum():
+            try:
+                for i in range(256):
+                    seen.add(TestFlag(i))
+            except Exception:
+                failed[0] = True
+        threads = [
+                threading.Thread(target=cycle_enum)
+                for _ in range(8)
+                ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertFalse(
+                failed[0],
+                'at least one thread failed while creating composite members')
+        self.assertEqual(256, len(seen), 'too many composite members created')
+
+    def test_pseudo_member_cache_invalid(self):
+        with self.assertRaisesRegex(TypeError, '_pseudo_member_cache_ must be'):
+            class Color(Flag):
+                _pseudo_member_cache_ = 'lru'
+                RED = 1
+        with self.assertRaisesRegex(ValueError, 'must be at least 1'):
+            class Color(Flag):
+                _pseudo_member_cache_ = 0
+                RED = 1
+
 
 class TestIntFlag(TestCase):
     """Tests of the IntFlags."""
@@ -6474,6 +7099,26 @@ class TestIntFlag(TestCase):
                 'at least one thread failed while creating composite members')
         self.assertEqual(256, len(seen), 'too many composite members created')
 
+    def test_pseudo_member_cache_lru_negative(self):
+        class Perm(IntFlag):
+            _pseudo_member_cache_ = 4
+            R = 4
+            W = 2
+            X = 1
+        for value in range(-64, 64):
+            Perm(value)
+        self.assertEqual(len(Perm._pseudo_members_._map), 4)
+        self.assertEqual(sorted(Perm._value2member_map_), [1, 2, 4])
+        self.assertEqual(Perm(-1), 7)
+        self.assertEqual(Perm(3), Perm.W | Perm.X)
+
+    @unittest.skipIf(PY2, 'int subclasses support weak references on Python 2')
+    def test_pseudo_member_cache_weak_intflag(self):
+        with self.assertRaisesRegex(TypeError, 'do not support weak references'):
+            class Perm(IntFlag):
+                _pseudo_member_cache_ = 'weak'
+                R = 4
+
     def test_init_subclass(self):
         class MyEnum(IntEnum):
             def __init_subclass__(cls, **kwds):
@@ -6811,6 +7456,18 @@ class TestNamedTuple(TestCase):
         df = DeathForm('sickly green', '2x4', 'foul')
         test_pickle_dump_load(self.assertEqual, df)
 
+    def test_pickle_namedtuple_reduce(self):
+        if isinstance(DeathForm, Exception):
+            raise DeathForm
+        df = DeathForm('sickly green', '2x4', 'foul')
+        # protocol 2 and later recreate the tuple through __new__ directly
+        reduced = df.__reduce_ex__(2)
+        self.assertEqual(reduced[0].__name__, '__newobj__')
+        self.assertEqual(reduced[1], (DeathForm, 'sickly green', '2x4', 'foul'))
+        self.assertEqual(df.__reduce_ex__(1), (DeathForm, ('sickly green', '2x4', 'foul')))
+        for protocol in range(2, HIGHEST_PROTOCOL+1):
+            self.assertIs(type(loads(dumps(df, protocol=protocol))), DeathForm)
+
     def test_subclassing(self):
         if isinstance(ThatsIt, Exception):
             raise ThatsIt
@@ -7001,6 +7658,288 @@ class TestNamedTuple(TestCase):
         self.assertEqual(p2['last'], 'Doe')
         self.assertRaisesRegex(AttributeError, 'object has no attribute .nope.', p1.__getitem__, 'nope')
 
+    def test_specialized_new(self):
+        class Point(NamedTuple):
+            x = 0, 'horizontal coordinate'
+            y = 1, 'vertical coordinate', -1
+            horizontal = 0
+        self.assertTrue(getattr(Point.__new__, '_generated_', False))
+        self.assertEqual(Point(1, 2), (1, 2))
+        self.assertEqual(Point(1), (1, -1))
+        self.assertEqual(Point(y=3, x=4), (4, 3))
+        self.assertEqual(Point(horizontal=5), (5, -1))
+        self.assertEqual(Point._make([6, 7]), (6, 7))
+        self.assertRaisesRegex(TypeError, 'values not provided for field.s.: horizontal', Point)
+        self.assertRaisesRegex(TypeError, 'values not provided for field.s.: horizontal', Point, y=2)
+        self.assertRaisesRegex(TypeError, '2 fields expected, 3 received', Point, 1, 2, 3)
+        self.assertRaisesRegex(TypeError, 'unknown fields', Point, 1, z=3)
+        self.assertRaisesRegex(TypeError, 'specified more than once', Point, 1, horizontal=3)
+        self.assertRaisesRegex(TypeError, 'specified more than once', Point, 1, 2, y=3)
+        class Point3D(Point):
+            z = 2, 'depth', 0
+        self.assertTrue(getattr(Point3D.__new__, '_generated_', False))
+        self.assertEqual(Point3D(1, 2), (1, 2, 0))
+        self.assertEqual(Point3D(z=1, horizontal=2), (2, -1, 1))
+
+    def test_specialized_new_not_used(self):
+        class Reviewed(NamedTuple):
+            a = 0
+            b = 1
+            @classmethod
+            def _review_(cls, args):
+                args[1] = args[0] * 2
+        self.assertFalse(getattr(Reviewed.__new__, '_generated_', False))
+        self.assertEqual(Reviewed(3), (3, 6))
+        class Custom(NamedTuple):
+            a = 0
+            def __new__(cls, a):
+                return NamedTuple.__new__(cls, a * 10)
+        class SubCustom(Custom):
+            b = 1, 'b', 0
+        self.assertEqual(Custom(1), (10, ))
+        self.assertFalse(getattr(SubCustom.__new__, '_generated_', False))
+        self.assertEqual(SubCustom(2), (20, 0))
+        Keyword = NamedTuple('Keyword', 'if else')
+        self.assertEqual(Keyword(1, 2), (1, 2))
+        self.assertEqual(Keyword(**{'if': 1, 'else': 2}), (1, 2))
+
+    def test_specialized_new_not_inherited_by_reviewed_subclass(self):
+        class Pair(NamedTuple):
+            a = 0
+            b = 1
+        class Scaled(Pair):
+            @classmethod
+            def _review_(cls, args):
+                args[0] *= 10
+        self.assertTrue(getattr(Pair.__new__, '_generated_', False))
+        self.assertFalse(getattr(Scaled.__new__, '_generated_', False))
+        self.assertIs(type(Scaled.__dict__['a']), _TupleAttributeAtIndex)
+        self.assertEqual(Pair(1, 2), (1, 2))
+        self.assertEqual(Scaled(1, 2), (10, 2))
+        self.assertEqual(Scaled(a=1, b=2), (10, 2))
+        self.assertEqual(list(Scaled._make_many([(1, 2), {'a': 3, 'b': 4}])), [(10, 2), (30, 4)])
+
+    def test_specialized_new_reached_through_super(self):
+        class Pair(NamedTuple):
+            a = 0
+            b = 1
+        class Triple(Pair):
+            c = 2
+            def __new__(cls, *args, **kwds):
+                return super(Triple, cls).__new__(cls, *args, **kwds)
+        self.assertTrue(getattr(Pair.__new__, '_generated_', False))
+        self.assertRaisesRegex(TypeError, 'values not provided for field.s.: c', Triple, 1, 2)
+        t = Triple(1, 2, 3)
+        self.assertEqual(t, (1, 2, 3))
+        self.assertEqual(t.c, 3)
+        self.assertEqual(Triple(c=3, a=1, b=2), (1, 2, 3))
+        self.assertEqual(Pair(1, 2), (1, 2))
+
+    def test_fixed_size_field_access(self):
+        class Point(NamedTuple):
+            x = 0, 'horizontal coordinate', 1
+            y = 1, 'vertical coordinate'
+        self.assertIsNot(type(Point.__dict__['x']), _TupleAttributeAtIndex)
+        self.assertEqual(Point.x.__doc__, 'horizontal coordinate')
+        self.assertEqual(Point.x.default, 1)
+        self.assertEqual(Point.y.index, 1)
+        p = Point(y=3)
+        self.assertEqual((p.x, p.y), (1, 3))
+        self.assertRaises(AttributeError, setattr, p, 'x', 5)
+        class Minimum(NamedTuple):
+            _size_ = TupleSize.minimum
+            a = 0
+            b = 1
+        class Variable(NamedTuple):
+            _size_ = TupleSize.variable
+            a = 0
+            b = 1
+        for cls in (Minimum, Variable):
+            self.assertIs(type(cls.__dict__['a']), _TupleAttributeAtIndex)
+        v = Variable(1)
+        self.assertEqual(v.a, 1)
+        self.assertRaisesRegex(AttributeError, 'no value for b', getattr, v, 'b')
+
+    def test_make_many(self):
+        class Point(NamedTuple):
+            x = 0, 'x_coord coordinate', 1
+            y = 1, 'vertical coordinate'
+            x_coord = 0
+        rows = iter([(2, 3), [4, 5], {'y': 6}, {'x_coord': 7, 'y': 8}])
+        points = Point._make_many(rows)
+        self.assertEqual(next(points), (2, 3))
+        # rows are consumed lazily
+        self.assertEqual(len(list(rows)), 3)
+        points = list(Point._make_many([(2, 3), [4, 5], {'y': 6}, {'x_coord': 7, 'y': 8}]))
+        self.assertEqual(points, [(2, 3), (4, 5), (1, 6), (7, 8)])
+        for point in points:
+            self.assertIs(type(point), Point)
+        self.assertRaisesRegex(TypeError, '2 fields expected, 3 received', list, Point._make_many([(1, 2, 3)]))
+        self.assertRaisesRegex(TypeError, 'values not provided for field.s.: y', list, Point._make_many([(1, )]))
+        self.assertRaisesRegex(TypeError, 'unknown fields', list, Point._make_many([{'z': 1}]))
+        self.assertRaisesRegex(TypeError, 'specified more than once', list, Point._make_many([{'x': 1, 'x_coord': 2}]))
+
+    def test_make_many_review(self):
+        class Reviewed(NamedTuple):
+            _size_ = TupleSize.variable
+            a = 0
+            b = 1
+            c = 2, 'c', 'default'
+            @classmethod
+            def _review_(cls, final_args):
+                if final_args[1] is undefined:
+                    final_args[1] = final_args[0] * 2
+        rows = [(1, ), (2, 3), {'a': 4}, {'a': 5, 'c': 6}]
+        self.assertEqual(
+                list(Reviewed._make_many(rows)),
+                [Reviewed(*r) if isinstance(r, tuple) else Reviewed(**r) for r in rows],
+                )
+        self.assertEqual(list(Reviewed._make_many(rows))[0], (1, 2, 'default'))
+        class Custom(NamedTuple):
+            a = 0
+            def __new__(cls, a):
+                return NamedTuple.__new__(cls, a * 10)
+        self.assertEqual(list(Custom._make_many([(1, ), {'a': 2}])), [(10, ), (20, )])
+        class Static(NamedTuple):
+            a = 0
+            b = 1
+            @staticmethod
+            def _review_(final_args):
+                final_args[0] *= 10
+        self.assertEqual(list(Static._make_many([(1, 2), {'a': 3, 'b': 4}])), [(10, 2), (30, 4)])
+
+    def test_struct(self):
+        class Header(NamedTuple):
+            _struct_ = '!HHI'
+            kind = 0
+            flags = 1
+            length = 2
+        self.assertEqual(Header._struct_.size, 8)
+        header = Header(1, 2, 3)
+        data = header._pack()
+        self.assertEqual(data, b'\x00\x01\x00\x02\x00\x00\x00\x03')
+        self.assertEqual(Header._unpack(data), header)
+        self.assertIs(type(Header._unpack(data)), Header)
+        self.assertEqual(Header._unpack(b'xx' + data, 2), header)
+        buffer = bytearray(data + Header(4, 5, 6)._pack())
+        self.assertEqual(list(Header._iter_unpack(memoryview(buffer))), [(1, 2, 3), (4, 5, 6)])
+        self.assertRaises(struct.error, Header._iter_unpack, buffer[:-1])
+        # subclasses with the same fields keep the format, others do not
+        class Named(Header):
+            def describe(self):
+                return 'kind %d' % self.kind
+        self.assertEqual(Named._unpack(data).describe(), 'kind 1')
+        class Longer(Header):
+            extra = 3
+        self.assertIs(Longer._struct_, None)
+        self.assertRaisesRegex(TypeError, 'no _struct_ format', Longer(1, 2, 3, 4)._pack)
+        self.assertRaisesRegex(TypeError, 'no _struct_ format', Longer._unpack, data)
+
+    def test_struct_per_field(self):
+        class Color(Enum):
+            red = 1
+            green = 2
+        class Pixel(NamedTuple):
+            _struct_ = {'x': '<h', 'y': 'h', 'color': ('B', Color)}
+            x = 0
+            y = 1
+            color = 2, 'pixel color', Color.red
+        self.assertEqual(Pixel._struct_.size, 5)
+        pixel = Pixel(-1, 2, Color.green)
+        data = pixel._pack()
+        self.assertEqual(data, b'\xff\xff\x02\x00\x02')
+        self.assertIs(Pixel._unpack(data).color, Color.green)
+        self.assertEqual(Pixel(1, 2, 1)._pack(), b'\x01\x00\x02\x00\x01')
+        self.assertRaises(ValueError, Pixel._unpack, b'\x01\x00\x02\x00\x09')
+        class Plain(NamedTuple):
+            _struct_ = {'a': 'i', 'b': 'd'}
+            a = 0
+            b = 1
+        # standard sizes, no alignment: the byte order is filled in as '='
+        self.assertEqual(Plain._struct_.size, 12)
+        self.assertEqual(Plain(1, 2.0)._pack(), struct.pack('=id', 1, 2.0))
+
+    def test_struct_invalid(self):
+        def make(struct_format, size=TupleSize.fixed):
+            class Bad(NamedTuple):
+                _struct_ = struct_format
+                _size_ = size
+                a = 0
+                b = 1
+        self.assertRaisesRegex(TypeError, 'has 3 values for 2 fields', make, 'iii')
+        self.assertRaisesRegex(TypeError, 'invalid _struct_ format', make, 'iq!')
+        self.assertRaisesRegex(TypeError, 'no _struct_ format for field.s.: b', make, {'a': 'i'})
+        self.assertRaisesRegex(ValueError, 'has no field .c.', make, {'a': 'i', 'b': 'i', 'c': 'i'})
+        self.assertRaisesRegex(TypeError, 'fixed-size', make, 'ii', TupleSize.variable)
+        self.assertRaisesRegex(TypeError, 'no _struct_ format', NamedTuple('Plain', 'a b')(1, 2)._pack)
+
+
+class TestNamedTupleTable(TestCase):
+
+    def setUp(self):
+        class Point(NamedTuple):
+            x = 0, 'horizontal coordinate', 0
+            y = 1, 'vertical coordinate', 0
+            label = 2, 'what is here', None
+            x_coord = 0
+        self.Point = Point
+
+    def test_columns(self):
+        Point = self.Point
+        table = NamedTupleTable(Point, [(1, 2, 'a'), Point(3, 4, 'b'), {'y': 5}], types={'x': 'l', 'y': 'd'})
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table['x'].typecode, 'l')
+        self.assertEqual(table['y'].tolist(), [2.0, 4.0, 5.0])
+        self.assertEqual(table['label'], ['a', 'b', None])
+        self.assertIs(table['x_coord'], table['x'])
+        self.assertRaises(KeyError, table.__getitem__, 'z')
+        self.assertRaises(ValueError, NamedTupleTable, Point, types={'z': 'l'})
+
+    def test_rows(self):
+        Point = self.Point
+        table = NamedTupleTable(Point, [(1, 2, 'a'), (3, 4, 'b')])
+        row = table[-1]
+        self.assertEqual(row, (3, 4, 'b'))
+        self.assertEqual(row, Point(3, 4, 'b'))
+        self.assertEqual((row.x, row.y, row.label, row.x_coord), (3, 4, 'b', 3))
+        self.assertEqual((row[0], row['label']), (3, 'b'))
+        self.assertEqual(len(row), 3)
+        self.assertEqual(row._asdict(), Point(3, 4, 'b')._asdict())
+        self.assertEqual(repr(row), repr(Point(3, 4, 'b')))
+        self.assertRaises(AttributeError, getattr, row, 'z')
+        self.assertRaises(IndexError, table.__getitem__, 2)
+        self.assertEqual(list(table), [(1, 2, 'a'), (3, 4, 'b')])
+        instances = list(table.instances())
+        self.assertEqual(instances, [Point(1, 2, 'a'), Point(3, 4, 'b')])
+        self.assertIs(type(instances[0]), Point)
+
+    def test_append_extend_slice(self):
+        Point = self.Point
+        table = NamedTupleTable(Point, types={'x': 'l'})
+        table.append((1, 2))
+        table.extend([(3, 4), {'x': 5, 'label': 'c'}])
+        self.assertEqual(list(table.instances()), [(1, 2, None), (3, 4, None), (5, 0, 'c')])
+        part = table[1:]
+        self.assertEqual(len(part), 2)
+        self.assertEqual(part['x'].typecode, 'l')
+        self.assertEqual(part[0], (3, 4, None))
+        table.extend(table)
+        self.assertEqual(len(table), 6)
+        # a bad row leaves the table unchanged
+        self.assertRaises(TypeError, table.extend, [(7, 8), ('nine', 10)])
+        self.assertRaises(TypeError, table.append, (1, 2, 3, 4))
+        self.assertEqual(len(table), 6)
+        self.assertEqual(set(len(c) for c in table._columns), set([6]))
+
+    def test_invalid_classes(self):
+        class Variable(NamedTuple):
+            _size_ = TupleSize.variable
+            a = 0
+        self.assertRaises(TypeError, NamedTupleTable, Variable)
+        self.assertRaises(TypeError, NamedTupleTable, NamedTuple)
+        self.assertRaises(TypeError, NamedTupleTable, tuple)
+
+
 class TestNamedConstant(TestCase):
 
     def test_constantness(self):
@@ -7048,7 +7987,37 @@ class TestNamedConstant(TestCase):
         self.assertIs(stars, CardSuit.STARS)
         self.assertEqual(CardSuit.STARS, 5)
         self.assertTrue(CardSuit.STARS in CardSuit)
-
+        self.assertIs(CardSuit(5), CardSuit.STARS)
+
+    def test_value_lookup(self):
+        class Protocol(NamedConstant):
+            PING = 1
+            PONG = 2
+            ECHO = 2
+            PAIR = (1, 2)
+            LIST = [1, 2]
+        self.assertIs(Protocol(1), Protocol.PING)
+        self.assertIs(Protocol(2), Protocol.PONG)
+        self.assertIs(Protocol(1.0), Protocol.PING)
+        self.assertIs(Protocol((1, 2)), Protocol.PAIR)
+        self.assertIs(Protocol([1, 2]), Protocol.LIST)
+        self.assertIs(Protocol(Protocol.ECHO), Protocol.PONG)
+        self.assertRaisesRegex(ValueError, '3 does not exist', Protocol, 3)
+        self.assertRaisesRegex(ValueError, 'does not exist', Protocol, [3])
+        self.assertRaisesRegex(ValueError, 'does not exist', Protocol, {})
+        class More(Protocol):
+            QUIT = 9
+        self.assertIs(More(9), More.QUIT)
+        self.assertRaises(ValueError, More, 1)
+
+
+    def test_copy(self):
+        import copy
+        class APITypes(aenum.Constant):
+            STRING = "string"
+            LIST = [1, 2]
+        self.assertIs(copy.copy(APITypes.STRING), APITypes.STRING)
+        self.assertIs(copy.deepcopy(APITypes.LIST), APITypes.LIST)
     def test_constant_with_docstring(self):
         class Stuff(NamedConstant):
             Artifact = constant(7, "lucky number!")
@@ -7499,8 +8468,669 @@ class TestExtendEnum(TestCase):
         self.assertEqual(Color.BLACK.name, 'BLACK')
         self.assertEqual(Color.BLACK.value, 'black')
         self.assertEqual(len(Color), 4)
+
+    def test_extend_enum_many(self):
+        class Color(Enum):
+            red = 1
+            green = 2
+        added = extend_enum_many(Color, [('blue', 3), ('rojo', 1), ('mauve', ()), ('puce', ())])
+        self.assertEqual(added, [Color.blue, Color.red, Color.mauve, Color.puce])
+        self.assertEqual(Color.mauve.value, 4)
+        self.assertEqual(Color.puce.value, 5)
+        self.assertTrue(Color.rojo is Color.red)
+        self.assertEqual(Color._member_names_, ['red', 'green', 'blue', 'mauve', 'puce'])
+        self.assertEqual(list(Color.__members__), ['red', 'green', 'blue', 'rojo', 'mauve', 'puce'])
+        self.assertTrue(Color(5) is Color.puce)
+        #
+        extend_enum_many(Color, {'cyan': 6})
+        self.assertTrue(Color(6) is Color.cyan)
+
+    def test_extend_enum_many_flag(self):
+        class Color(Flag):
+            RED = 1
+            GREEN = 2
+        extend_enum_many(Color, [('BLUE', 4), ('WHITE', 7), ('BLACK', ())])
+        self.assertEqual(Color.BLACK.value, 8)
+        self.assertEqual(Color._flag_mask_, 15)
+        self.assertEqual(Color._singles_mask_, 15)
+        self.assertTrue(Color.RED | Color.GREEN | Color.BLUE is Color.WHITE)
+        self.assertEqual(len(Color), 4)
+
+    def test_extend_enum_many_is_atomic(self):
+        class Color(UniqueEnum):
+            red = 1
+            green = 2
+        self.assertRaisesRegex(
+                ValueError, 'is a duplicate of',
+                extend_enum_many, Color, [('blue', 3), ('black', 4), ('rojo', 1)],
+                )
+        self.assertRaisesRegex(TypeError, 'used more than once', extend_enum_many, Color, [('blue', 3), ('blue', 4)])
+        self.assertRaisesRegex(TypeError, 'already in use', extend_enum_many, Color, [('blue', 3), ('red', 4)])
+        self.assertEqual(Color._member_names_, ['red', 'green'])
+        self.assertEqual(list(Color.__members__), ['red', 'green'])
+        self.assertEqual(set(Color._value2member_map_), set([1, 2]))
+        self.assertFalse('blue' in Color.__dict__)
+        self.assertRaises(ValueError, Color, 3)
+        self.assertEqual(extend_enum_many(Color, [('blue', 3)]), [Color.blue])
+        self.assertTrue(Color(3) is Color.blue)
+
+    def test_extend_enum_many_flag_is_atomic(self):
+        class Color(Flag):
+            RED = 1
+            GREEN = 2
+        self.assertRaises(TypeError, extend_enum_many, Color, [('BLUE', 4), ('BLACK', 'black')])
+        self.assertEqual(Color._flag_mask_, 3)
+        self.assertEqual(Color._all_bits_, 3)
+        self.assertEqual(Color._singles_mask_, 3)
+        self.assertEqual(list(Color), [Color.RED, Color.GREEN])
+
+    def test_extend_enum_many_gnv_cannot_change_last_values(self):
+        def clear_values(name, start, count, last_values, *args, **kwds):
+            value = len(last_values) * 10 + 1
+            del last_values[:]
+            return value
+        class Color(Enum):
+            _generate_next_value_ = staticmethod(clear_values)
+            red = 1
+        extend_enum_many(Color, [('green', ()), ('blue', ())])
+        self.assertEqual([m.value for m in Color], [1, 11, 21])
         
 
+class TestEnumSet(TestCase):
+
+    def setUp(self):
+        class Color(Enum):
+            _order_ = 'red green blue black'
+            red = 1
+            green = 2
+            blue = 3
+            black = 4
+            crimson = 1
+        class Perm(Flag):
+            _order_ = 'R W X'
+            R = 4
+            W = 2
+            X = 1
+            RW = 6
+        self.Color = Color
+        self.Perm = Perm
+
+    def test_storage(self):
+        Color = self.Color
+        colors = EnumSet(Color, [Color.blue, Color.crimson])
+        self.assertEqual(int(colors), 0b101)
+        self.assertEqual(list(colors), [Color.red, Color.blue])
+        self.assertEqual(len(colors), 2)
+        self.assertTrue(Color.red in colors)
+        self.assertTrue(Color.crimson in colors)
+        self.assertFalse(Color.green in colors)
+        self.assertFalse(1 in colors)
+        self.assertFalse(self.Perm.R in colors)
+        self.assertTrue(colors)
+        self.assertFalse(EnumSet(Color))
+        self.assertEqual(repr(colors), 'EnumSet(Color, [<Color.red: 1>, <Color.blue: 3>])')
+        self.assertEqual(list(EnumSet.from_int(Color, 0b1010)), [Color.green, Color.black])
+        self.assertEqual(list(EnumSet.all_of(Color)), list(Color))
+        self.assertRaises(ValueError, EnumSet.from_int, Color, 0b10000)
+        self.assertRaises(TypeError, EnumSet, Color, [1])
+        self.assertRaises(TypeError, EnumSet, Color, [self.Perm.R])
+        self.assertRaises(TypeError, EnumSet, int)
+
+    def test_mutation(self):
+        Color = self.Color
+        colors = EnumSet(Color)
+        colors.add(Color.green)
+        colors.add(Color.black)
+        colors.add(Color.green)
+        self.assertEqual(list(colors), [Color.green, Color.black])
+        colors.discard(Color.black)
+        colors.discard(Color.red)
+        colors.discard('red')
+        self.assertEqual(list(colors), [Color.green])
+        colors.remove(Color.green)
+        self.assertRaises(KeyError, colors.remove, Color.green)
+        self.assertRaises(TypeError, colors.add, 'green')
+        colors |= [Color.red, Color.blue]
+        colors -= [Color.red, 'red']
+        self.assertEqual(list(colors), [Color.blue])
+        colors ^= EnumSet(Color, [Color.blue, Color.black])
+        colors &= set([Color.black, 'black'])
+        self.assertEqual(list(colors), [Color.black])
+        self.assertIs(colors.pop(), Color.black)
+        self.assertRaises(KeyError, colors.pop)
+        colors = EnumSet.all_of(Color)
+        colors -= colors
+        self.assertFalse(colors)
+        copied = EnumSet(Color, [Color.red])
+        copy = copied.copy()
+        copy.add(Color.blue)
+        self.assertEqual(list(copied), [Color.red])
+
+    def test_algebra(self):
+        Color = self.Color
+        warm = EnumSet(Color, [Color.red, Color.black])
+        cool = EnumSet(Color, [Color.green, Color.blue, Color.black])
+        self.assertEqual(list(warm | cool), list(Color))
+        self.assertEqual(list(warm & cool), [Color.black])
+        self.assertEqual(list(warm - cool), [Color.red])
+        self.assertEqual(list(warm ^ cool), [Color.red, Color.green, Color.blue])
+        self.assertEqual(list(~warm), [Color.green, Color.blue])
+        self.assertEqual(list(warm | set([Color.green])), [Color.red, Color.green, Color.black])
+        self.assertEqual(list(set([Color.green]) | warm), [Color.red, Color.green, Color.black])
+        self.assertEqual(list(warm & [Color.red, 'red']), [Color.red])
+        self.assertTrue(isinstance(warm | cool, EnumSet))
+        self.assertEqual(warm, set([Color.red, Color.black]))
+        self.assertEqual(set([Color.red, Color.black]), warm)
+        self.assertNotEqual(warm, cool)
+        self.assertNotEqual(warm, EnumSet(self.Perm))
+        self.assertTrue(warm & cool < warm <= warm)
+        self.assertTrue(warm > warm & cool)
+        self.assertTrue(warm >= set([Color.red]))
+        self.assertFalse(warm <= cool)
+        self.assertTrue(warm.isdisjoint(EnumSet(Color, [Color.green])))
+        self.assertFalse(warm.isdisjoint([Color.black]))
+        self.assertEqual(set(warm), set([Color.red, Color.black]))
+        self.assertRaises(TypeError, hash, warm)
+
+    def test_flag(self):
+        Perm = self.Perm
+        perms = EnumSet(Perm, [Perm.RW])
+        self.assertEqual(list(perms), [Perm.R, Perm.W])
+        self.assertTrue(Perm.RW in perms)
+        self.assertTrue(Perm.R | Perm.W in perms)
+        self.assertFalse(Perm.R | Perm.X in perms)
+        self.assertFalse(Perm(0) in perms)
+        perms.discard(Perm.RW)
+        self.assertFalse(perms)
+
+    def test_extend_enum(self):
+        Color = self.Color
+        colors = EnumSet(Color, [Color.red])
+        everything = EnumSet.all_of(Color)
+        extend_enum(Color, 'white', 5)
+        self.assertFalse(Color.white in colors)
+        colors.add(Color.white)
+        self.assertTrue(Color.white in colors)
+        self.assertEqual(list(colors), [Color.red, Color.white])
+        self.assertEqual(int(colors), 0b10001)
+        self.assertEqual(list(~everything), [Color.white])
+        self.assertEqual(list(EnumSet(Color, [Color.white])), [Color.white])
+
+    def test_pickle_and_copy(self):
+        import copy
+        colors = EnumSet(Stooges, [Stooges.MOE, Stooges.CURLY])
+        for proto in range(HIGHEST_PROTOCOL + 1):
+            self.assertEqual(loads(dumps(colors, proto)), colors)
+        self.assertEqual(copy.deepcopy(colors), colors)
+        self.assertIsNot(copy.copy(colors), colors)
+
+
+    def test_enum_class_collected(self):
+        Shape = Enum('Shape', 'circle square')
+        shapes = EnumSet(Shape, [Shape.square])
+        self.assertEqual(list(shapes), [Shape.square])
+        ref = weakref.ref(Shape)
+        del Shape, shapes
+        gc.collect()
+        self.assertIsNone(ref())
+
+
+class TestEnumMap(TestCase):
+
+    def setUp(self):
+        class Color(Enum):
+            _order_ = 'red green blue'
+            red = 1
+            green = 2
+            blue = 3
+            crimson = 1
+        self.Color = Color
+
+    def test_enum_class_collected(self):
+        Shape = Enum('Shape', 'circle square')
+        sides = EnumMap(Shape, {Shape.square: 4})
+        self.assertEqual(sides[Shape.square], 4)
+        ref = weakref.ref(Shape)
+        del Shape, sides
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_mapping(self):
+        Color = self.Color
+        counts = EnumMap(Color, {Color.blue: 3, Color.crimson: 1})
+        self.assertEqual(len(counts), 2)
+        self.assertEqual(list(counts), [Color.red, Color.blue])
+        self.assertEqual(list(counts.items()), [(Color.red, 1), (Color.blue, 3)])
+        self.assertEqual(list(counts.values()), [1, 3])
+        self.assertEqual(counts[Color.red], 1)
+        self.assertEqual(counts[Color.crimson], 1)
+        self.assertTrue(Color.crimson in counts)
+        self.assertFalse(Color.green in counts)
+        self.assertFalse('red' in counts)
+        self.assertRaises(KeyError, counts.__getitem__, Color.green)
+        self.assertRaises(KeyError, counts.__getitem__, 'red')
+        self.assertEqual(counts.get(Color.green), None)
+        self.assertEqual(counts.get('green', 0), 0)
+        counts[Color.green] = 0
+        counts[Color.red] += 1
+        self.assertEqual(dict(counts), {Color.red: 2, Color.green: 0, Color.blue: 3})
+        self.assertRaises(TypeError, counts.__setitem__, 'red', 1)
+        del counts[Color.crimson]
+        self.assertRaises(KeyError, counts.__delitem__, Color.red)
+        self.assertEqual(counts.pop(Color.blue), 3)
+        self.assertEqual(counts.setdefault(Color.blue, 7), 7)
+        self.assertEqual(counts.popitem(), (Color.green, 0))
+        counts.update([(Color.red, 5)])
+        self.assertEqual(
+                repr(counts),
+                'EnumMap(Color, {<Color.red: 1>: 5, <Color.blue: 3>: 7})',
+                )
+        counts.clear()
+        self.assertEqual(len(counts), 0)
+        self.assertEqual(list(counts), [])
+
+    def test_fromkeys_and_equality(self):
+        Color = self.Color
+        handlers = EnumMap.fromkeys(Color)
+        self.assertEqual(list(handlers.items()), [(Color.red, None), (Color.green, None), (Color.blue, None)])
+        zeros = EnumMap.fromkeys(Color, [Color.blue, Color.crimson], 0)
+        self.assertEqual(list(zeros.items()), [(Color.red, 0), (Color.blue, 0)])
+        self.assertEqual(zeros, {Color.red: 0, Color.blue: 0})
+        self.assertEqual({Color.red: 0, Color.blue: 0}, zeros)
+        self.assertEqual(zeros, EnumMap(Color, zeros))
+        self.assertNotEqual(zeros, EnumMap(Color, {Color.red: 0, Color.green: 0}))
+        self.assertNotEqual(zeros, handlers)
+        copied = zeros.copy()
+        copied[Color.red] = 1
+        self.assertEqual(zeros[Color.red], 0)
+        self.assertRaises(TypeError, hash, zeros)
+
+    def test_extend_enum(self):
+        Color = self.Color
+        counts = EnumMap.fromkeys(Color, value=0)
+        extend_enum(Color, 'white', 4)
+        self.assertFalse(Color.white in counts)
+        self.assertEqual(counts.get(Color.white), None)
+        counts[Color.white] = 1
+        self.assertEqual(list(counts), [Color.red, Color.green, Color.blue, Color.white])
+        self.assertEqual(len(counts), 4)
+        other = EnumMap.fromkeys(Color, value=0)
+        self.assertEqual(len(other), 4)
+        self.assertNotEqual(other, counts)
+        other[Color.white] = 1
+        self.assertEqual(other, counts)
+
+    def test_flag_keys(self):
+        class Perm(Flag):
+            _order_ = 'R W X'
+            R = 4
+            W = 2
+            X = 1
+            RW = 6
+        self.assertIn('RW', Perm.__members__)
+        modes = EnumMap(Perm, {Perm.R: 'read', Perm.X: 'execute'})
+        self.assertEqual(list(modes), [Perm.R, Perm.X])
+        for combined in (Perm.RW, Perm.R | Perm.X, Perm(0)):
+            self.assertRaisesRegex(ValueError, 'combined flags have no slot', modes.__setitem__, combined, 'x')
+            self.assertFalse(combined in modes)
+            self.assertRaises(KeyError, modes.__getitem__, combined)
+        self.assertRaisesRegex(TypeError, 'is not a member of', modes.__setitem__, self.Color.red, 'x')
+        self.assertEqual(len(modes), 2)
+
+    def test_pickle_and_copy(self):
+        import copy
+        counts = EnumMap(Stooges, {Stooges.MOE: 1, Stooges.CURLY: [2]})
+        for proto in range(HIGHEST_PROTOCOL + 1):
+            self.assertEqual(loads(dumps(counts, proto)), counts)
+        deep = copy.deepcopy(counts)
+        self.assertEqual(deep, counts)
+        self.assertIsNot(deep[Stooges.CURLY], counts[Stooges.CURLY])
+        self.assertIs(copy.copy(counts)[Stooges.CURLY], counts[Stooges.CURLY])
+
+
+@unittest.skipUnless(numpy, 'numpy not installed')
+class TestEnumArray(TestCase):
+
+    def setUp(self):
+        class Status(Enum):
+            _order_ = 'ok moved missing broken'
+            ok = 200
+            moved = 301
+            missing = 404
+            broken = 500
+            fine = 200
+        self.Status = Status
+
+    def test_numpy_imported_lazily(self):
+        import aenum
+        import subprocess
+        self.assertFalse(hasattr(aenum, 'numpy'))
+        script = 'import sys, aenum; print("numpy" in sys.modules)'
+        output = subprocess.check_output(
+                [sys.executable, '-c', script],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(aenum.__file__))),
+                )
+        self.assertEqual(output.strip(), b'False')
+
+    def test_storage(self):
+        Status = self.Status
+        statuses = EnumArray(Status, [Status.ok, Status.missing, Status.fine, Status.broken])
+        self.assertEqual(statuses.dtype, numpy.uint8)
+        self.assertEqual(statuses.codes.tolist(), [0, 2, 0, 3])
+        self.assertEqual(len(statuses), 4)
+        self.assertEqual(list(statuses), [Status.ok, Status.missing, Status.ok, Status.broken])
+        self.assertTrue(statuses[1] is Status.missing)
+        self.assertTrue(statuses[numpy.int64(3)] is Status.broken)
+        self.assertEqual(list(statuses[1:3]), [Status.missing, Status.ok])
+        self.assertRaises(ValueError, statuses.codes.__setitem__, 0, 1)
+        self.assertRaises(TypeError, EnumArray, Status, [200])
+
+    def test_dtype(self):
+        Big = Enum('Big', ['m%d' % i for i in range(300)])
+        big = EnumArray(Big, [Big.m0, Big.m299])
+        self.assertEqual(big.dtype, numpy.uint16)
+        self.assertEqual(big.codes.tolist(), [0, 299])
+
+    def test_conversion(self):
+        Status = self.Status
+        statuses = EnumArray.from_values(Status, numpy.array([404, 200, 404, 500, 200]))
+        self.assertEqual(list(statuses), [Status.missing, Status.ok, Status.missing, Status.broken, Status.ok])
+        self.assertEqual(statuses.values().tolist(), [404, 200, 404, 500, 200])
+        self.assertEqual(statuses.names().tolist(), ['missing', 'ok', 'missing', 'broken', 'ok'])
+        named = EnumArray.from_names(Status, ['fine', 'moved', 'broken'])
+        self.assertEqual(list(named), [Status.ok, Status.moved, Status.broken])
+        coded = EnumArray.from_codes(Status, [3, 1])
+        self.assertEqual(list(coded), [Status.broken, Status.moved])
+        self.assertRaises(ValueError, EnumArray.from_values, Status, [200, 201])
+        self.assertRaises(KeyError, EnumArray.from_names, Status, ['ok', 'nope'])
+        self.assertRaises(ValueError, EnumArray.from_codes, Status, [4])
+
+    def test_mixed_values(self):
+        class Mixed(Enum):
+            one = 1
+            uno = 'uno'
+        mixed = EnumArray.from_values(Mixed, [1, 'uno', 1])
+        self.assertEqual(list(mixed), [Mixed.one, Mixed.uno, Mixed.one])
+        self.assertEqual(mixed.values().tolist(), [1, 'uno', 1])
+
+    def test_comparisons(self):
+        Status = self.Status
+        statuses = EnumArray.from_values(Status, [200, 404, 200, 301])
+        self.assertEqual((statuses == Status.ok).tolist(), [True, False, True, False])
+        self.assertEqual((statuses != Status.ok).tolist(), [False, True, False, True])
+        self.assertEqual(statuses.isin([Status.moved, Status.missing]).tolist(), [False, True, False, True])
+        self.assertEqual((statuses == statuses[::-1]).tolist(), [False, False, False, False])
+        self.assertEqual(list(statuses[statuses == Status.ok]), [Status.ok, Status.ok])
+
+    def test_assignment_after_extend(self):
+        Status = self.Status
+        statuses = EnumArray(Status, [Status.ok, Status.ok])
+        statuses[0] = Status.broken
+        extend_enum_many(Status, [('s%d' % i, 1000 + i) for i in range(300)])
+        statuses[1] = Status.s299
+        self.assertEqual(statuses.dtype, numpy.uint16)
+        self.assertEqual(list(statuses), [Status.broken, Status.s299])
+
+
+@unittest.skipUnless(numpy, 'numpy not installed')
+class TestFlagArray(TestCase):
+
+    def test_flag(self):
+        class Color(Flag):
+            RED = 1
+            GREEN = 2
+            BLUE = 4
+        colors = FlagArray(Color, [Color.RED, Color.RED | Color.GREEN, Color(0), 6])
+        self.assertEqual(colors.dtype, numpy.uint8)
+        self.assertEqual(colors.masks.tolist(), [1, 3, 0, 6])
+        self.assertEqual(list(colors), [Color.RED, Color.RED|Color.GREEN, Color(0), Color.GREEN|Color.BLUE])
+        self.assertTrue(colors[0] is Color.RED)
+        self.assertEqual(colors.names().tolist(), ['RED', 'RED|GREEN', None, 'GREEN|BLUE'])
+        self.assertEqual(colors.has_any(Color.GREEN).tolist(), [False, True, False, True])
+        self.assertEqual(colors.has_any([Color.RED, Color.BLUE]).tolist(), [True, True, False, True])
+        self.assertEqual(colors.has_all([Color.RED, Color.GREEN]).tolist(), [False, True, False, False])
+        self.assertEqual((colors == Color.RED).tolist(), [True, False, False, False])
+        self.assertEqual((colors | Color.BLUE).masks.tolist(), [5, 7, 4, 6])
+        self.assertEqual((Color.BLUE & colors).masks.tolist(), [0, 0, 0, 4])
+        self.assertEqual((colors ^ colors[::-1]).masks.tolist(), [7, 3, 3, 7])
+        self.assertEqual((~colors).masks.tolist(), [6, 4, 7, 1])
+        self.assertEqual(colors[colors.has_any(Color.RED)].masks.tolist(), [1, 3])
+        self.assertRaises(TypeError, _or_, colors, 4)
+        self.assertRaises(ValueError, FlagArray, Color, [8])
+
+    def test_dtype(self):
+        Wide = IntFlag('Wide', [('B%d' % i, 2 ** i) for i in range(64)])
+        wide = FlagArray(Wide, [Wide.B63, Wide.B0])
+        self.assertEqual(wide.dtype, numpy.uint64)
+        self.assertEqual((wide | Wide.B1).masks.tolist(), [2 ** 63 + 2, 3])
+        self.assertEqual((~wide).masks.tolist(), [2 ** 63 - 1, 2 ** 64 - 2])
+        Medium = Flag('Medium', [('B%d' % i, 2 ** i) for i in range(12)])
+        self.assertEqual(FlagArray(Medium, [Medium.B0]).dtype, numpy.uint16)
+
+    def test_boundaries_match_members(self):
+        for boundary in (STRICT, CONFORM, EJECT, KEEP):
+            class Perm(IntFlag):
+                _boundary_ = boundary
+                X = 1
+                W = 2
+                S = 8
+            values = []
+            for value in range(-20, 28):
+                try:
+                    Perm(value)
+                except ValueError:
+                    continue
+                values.append(value)
+            perms = FlagArray(Perm, numpy.array(values))
+            expected = [Perm(v) for v in values]
+            self.assertEqual([(type(p), int(p)) for p in perms], [(type(p), int(p)) for p in expected])
+            if boundary is EJECT:
+                self.assertEqual(perms.ejected.tolist(), [not isinstance(p, Perm) for p in expected])
+            else:
+                self.assertTrue(perms.ejected is None)
+            inverted = [~p if isinstance(p, Perm) else Perm(~p) for p in expected]
+            self.assertEqual([int(p) for p in ~perms], [int(p) for p in inverted])
+            for flag in (Perm.X, Perm.S, Perm.X|Perm.W):
+                self.assertEqual([int(p) for p in perms | flag], [int(p | flag) for p in expected])
+                self.assertEqual([int(p) for p in perms & flag], [int(p & flag) for p in expected])
+                self.assertEqual([int(p) for p in perms ^ flag], [int(p ^ flag) for p in expected])
+
+    def test_strict_boundary(self):
+        class Perm(IntFlag):
+            _boundary_ = STRICT
+            X = 1
+            W = 2
+        self.assertRaisesRegex(ValueError, 'invalid value 4', FlagArray, Perm, [1, 3, 4])
+        self.assertRaisesRegex(ValueError, 'invalid value 5', _or_, FlagArray(Perm, [1, 3]), 4)
+
+
+@unittest.skipUnless(sqlite3, 'sqlite3 not available')
+class TestSqlite(TestCase):
+
+    def setUp(self):
+        class Color(Enum):
+            _order_ = 'red green crimson'
+            red = 1
+            green = 2
+            crimson = 1
+        class Perm(IntFlag):
+            _order_ = 'R W X'
+            R = 4
+            W = 2
+            X = 1
+        class Kind(StrEnum):
+            file = 'f'
+            link = 'l'
+        self.Color = Color
+        self.Perm = Perm
+        self.Kind = Kind
+        self.db = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+
+    def tearDown(self):
+        self.db.close()
+
+    def round_trip(self, declared, rows):
+        db = self.db
+        db.execute('CREATE TABLE t (%s)' % ', '.join(['c%d %s' % (i, d) for i, d in enumerate(declared)]))
+        db.executemany('INSERT INTO t VALUES (%s)' % ', '.join('?' * len(declared)), rows)
+        self.assertEqual(db.execute('SELECT * FROM t').fetchall(), rows)
+        columns = ', '.join(['CAST(c%d AS TEXT)' % i for i in range(len(declared))])
+        return db.execute('SELECT %s FROM t' % columns).fetchall()
+
+    def test_by_value(self):
+        Color, Perm, Kind = self.Color, self.Perm, self.Kind
+        self.assertTrue(register_sqlite(Color, typename='ColorByValue') is Color)
+        register_sqlite(Perm, typename='PermByValue')
+        register_sqlite(Kind, typename='KindByValue')
+        stored = self.round_trip(
+                ('ColorByValue', 'PermByValue', 'KindByValue'),
+                [(Color.red, Perm.R|Perm.W, Kind.file), (Color.green, Perm(0), Kind.link)],
+                )
+        self.assertEqual(stored, [('1', '6', 'f'), ('2', '0', 'l')])
+
+    def test_by_name(self):
+        Color, Perm, Kind = self.Color, self.Perm, self.Kind
+        register_sqlite(Color, 'name', typename='ColorByName')
+        register_sqlite(Perm, 'name', typename='PermByName')
+        register_sqlite(Kind, 'name', typename='KindByName')
+        stored = self.round_trip(
+                ('ColorByName', 'PermByName', 'KindByName'),
+                [(Color.crimson, Perm.R|Perm.W, Kind.file), (Color.green, Perm(0), Kind.link)],
+                )
+        self.assertEqual(stored, [('red', 'R|W', 'file'), ('green', '0', 'link')])
+
+    def test_by_index(self):
+        Color = self.Color
+        register_sqlite(Color, 'index', typename='ColorByIndex')
+        stored = self.round_trip(('ColorByIndex', ), [(Color.green, ), (Color.red, )])
+        self.assertEqual(stored, [('1', ), ('0', )])
+        extend_enum(Color, 'blue', 3)
+        self.db.execute('INSERT INTO t VALUES (?)', (Color.blue, ))
+        self.assertEqual(self.db.execute('SELECT c0 FROM t').fetchall()[-1], (Color.blue, ))
+        self.db.execute('INSERT INTO t VALUES (7)')
+        self.assertRaises(ValueError, self.db.execute('SELECT c0 FROM t').fetchall)
+
+    def test_invalid(self):
+        self.assertRaises(TypeError, register_sqlite, self.Perm, 'index')
+        self.assertRaises(ValueError, register_sqlite, self.Color, 'member')
+        self.assertRaises(TypeError, register_sqlite, int)
+        Mixed = Enum('Mixed', [('one', 1), ('two', 'two')])
+        self.assertRaises(TypeError, register_sqlite, Mixed)
+        register_sqlite(Mixed, 'name')
+
+
+class TestEnumJSON(TestCase):
+
+    def setUp(self):
+        class Color(Enum):
+            _order_ = 'red green'
+            red = 1
+            green = 2
+        class Perm(IntFlag):
+            _order_ = 'R W X'
+            R = 4
+            W = 2
+            X = 1
+        class Kind(StrEnum):
+            file = 'f'
+            link = 'l'
+        class Entry(NamedTuple):
+            id = 0
+            color = 1
+            perm = 2
+            kind = 3, 'kind', Kind.file
+        self.Color = Color
+        self.Perm = Perm
+        self.Kind = Kind
+        self.Entry = Entry
+        self.schema = {
+                'entries.*': Entry,
+                'entries.*.color': Color, 'entries.*.perm': Perm, 'entries.*.kind': Kind,
+                'entries.*.1': Color, 'entries.*.2': Perm, 'entries.*.3': Kind,
+                'default': Color,
+                }
+
+    def test_encode(self):
+        Color, Perm, Kind, Entry = self.Color, self.Perm, self.Kind, self.Entry
+        data = {
+                'entries': [Entry(1, Color.red, Perm.R|Perm.W), Entry(2, Color.green, Perm(0), Kind.link)],
+                'default': Color.green,
+                'kinds': (Kind.file, Kind.link),
+                }
+        self.assertEqual(
+                json.loads(json.dumps(data, cls=EnumJSONEncoder)),
+                {
+                    'entries': [
+                        {'id': 1, 'color': 1, 'perm': 6, 'kind': 'f'},
+                        {'id': 2, 'color': 2, 'perm': 0, 'kind': 'l'},
+                        ],
+                    'default': 2,
+                    'kinds': ['f', 'l'],
+                    })
+        encoder = EnumJSONEncoder(enum_as='name', flag_as='values', namedtuple_as='array', sort_keys=True)
+        self.assertEqual(
+                encoder.encode(data),
+                '{"default": "green", "entries": [[1, "red", [4, 2], "file"], [2, "green", [], "link"]], '
+                '"kinds": ["file", "link"]}',
+                )
+        self.assertEqual(encoder.encode({Color.red: None}), '{"red": null}')
+        self.assertEqual(''.join(encoder.iterencode([Color.red])), '["red"]')
+        self.assertEqual(encoder.encode(Kind.link), '"link"')
+        self.assertEqual(json.dumps(Kind.link, cls=EnumJSONEncoder), '"l"')
+        self.assertRaises(TypeError, encoder.encode, [object()])
+        self.assertRaises(ValueError, EnumJSONEncoder, enum_as='member')
+        self.assertRaises(ValueError, EnumJSONEncoder, namedtuple_as='dict')
+
+    def test_encode_circular(self):
+        Color = self.Color
+        items = [Color.red]
+        items.append(items)
+        self.assertRaisesRegex(ValueError, 'Circular reference detected', json.dumps, items, cls=EnumJSONEncoder)
+        mapping = {'color': Color.red}
+        mapping['self'] = [mapping]
+        self.assertRaisesRegex(ValueError, 'Circular reference detected', json.dumps, mapping, cls=EnumJSONEncoder)
+        # the same container more than once is not circular
+        shared = [Color.green]
+        self.assertEqual(json.dumps([shared, shared], cls=EnumJSONEncoder), '[[2], [2]]')
+
+    def test_round_trip(self):
+        Color, Perm, Kind, Entry = self.Color, self.Perm, self.Kind, self.Entry
+        data = {
+                'entries': [Entry(1, Color.red, Perm.R|Perm.W), Entry(2, Color.green, Perm(0), Kind.link)],
+                'default': Color.green,
+                }
+        for options in (
+                {},
+                {'enum_as': 'name', 'flag_as': 'values'},
+                {'enum_as': 'name', 'flag_as': 'values', 'namedtuple_as': 'array'},
+            ):
+            text = json.dumps(data, cls=EnumJSONEncoder, **options)
+            options.pop('namedtuple_as', None)
+            decoded = json.loads(text, cls=EnumJSONDecoder, schema=self.schema, **options)
+            self.assertEqual(decoded, data)
+            self.assertTrue(decoded['entries'][0].color is Color.red)
+            self.assertTrue(type(decoded['entries'][1]) is Entry)
+
+    def test_decode(self):
+        Color, Perm, Entry = self.Color, self.Perm, self.Entry
+        decoder = EnumJSONDecoder(self.schema)
+        self.assertEqual(
+                decoder.decode('{"entries": [{"id": 3, "color": 1, "perm": 7}, null], "default": null}'),
+                {'entries': [Entry(3, Color.red, Perm.R|Perm.W|Perm.X), None], 'default': None},
+                )
+        self.assertEqual(decoder.decode('{"other": 1}'), {'other': 1})
+        self.assertEqual(EnumJSONDecoder({'': Color}).decode('2'), Color.green)
+        self.assertEqual(EnumJSONDecoder({'*': Color}).decode('{"a": 1, "b": 2}'), {'a': Color.red, 'b': Color.green})
+        self.assertEqual(EnumJSONDecoder({'1': Color}).decode('[1, 1]'), [1, Color.red])
+        self.assertRaises(ValueError, decoder.decode, '{"default": 3}')
+        by_name = EnumJSONDecoder({'*': Color}, enum_as='name')
+        self.assertEqual(by_name.decode('["red", "green"]'), [Color.red, Color.green])
+        self.assertRaisesRegex(ValueError, "u?'blue' is not a valid Color name", by_name.decode, '["red", "blue"]')
+        self.assertRaisesRegex(ValueError, r"\[1\] is not a valid Color name", by_name.decode, '[[1]]')
+        self.assertRaises(TypeError, decoder.decode, '{"entries": [{"id": 3, "hue": 1, "perm": 7}]}')
+        self.assertRaises(TypeError, EnumJSONDecoder, {'': dict})
+
+
 class TestIssues(TestCase):
 
     def test_auto_multi_int(self):
@@ -5,7 +5,6 @@ from ._enum import StdlibEnumMeta, StdlibEnum, StdlibIntEnum, StdlibFlag, Stdlib
 from . import pyver, PY3_3, PY3_4, PY3_5, PY3_6, PY3_7, PY3_11
 from . import add_stdlib_integration, remove_stdlib_integration
 
-from collections import OrderedDict
 from datetime import timedelta
 from pickle import dumps, loads, PicklingError, HIGHEST_PROTOCOL
 from unittest import TestCase, main
@@ -248,7 +247,7 @@ class TestEnumV3(TestCase):
             first = 1
             second = 2
             third = 3
-        self.assertTrue(type(AlwaysOrdered.__members__) is OrderedDict)
+        self.assertEqual(list(AlwaysOrdered.__members__), ['first', 'second', 'third'])
 
     def test_comparisons(self):
         def bad_compare():
@@ -0,0 +1,59 @@
+"""
+Enum class construction time against member count.
+
+run from the repository root:
+
+    python -m benchmarks.enum_creation [max_members]
+
+Each style should take roughly ten times longer for ten times the members;
+the last column is the time per member, which should stay (roughly) flat.
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+from aenum import Enum, MultiValue, auto
+
+
+def build(style, count):
+    names = ['M%d' % i for i in range(count)]
+    clsdict = Enum.__class__.__prepare__('Big', (Enum, ))
+    if style == 'auto()':
+        for name in names:
+            clsdict[name] = auto()
+    elif style == 'explicit':
+        for i, name in enumerate(names):
+            clsdict[name] = i
+    elif style == 'MultiValue':
+        clsdict['_settings_'] = MultiValue
+        for i, name in enumerate(names):
+            clsdict[name] = i, 'v%d' % i, 'w%d' % i
+    elif style == '_init_':
+        clsdict['_init_'] = 'value label'
+        for i, name in enumerate(names):
+            clsdict[name] = i, 'label %d' % i
+    else:
+        raise ValueError('unknown style: %r' % (style, ))
+    return Enum.__class__('Big', (Enum, ), clsdict)
+
+
+def main(max_members=100000):
+    counts = []
+    count = 100
+    while count <= max_members:
+        counts.append(count)
+        count *= 10
+    print('%-12s %10s %12s %14s' % ('style', 'members', 'seconds', 'usec/member'))
+    for style in ('auto()', 'explicit', 'MultiValue', '_init_'):
+        for count in counts:
+            start = time.time()
+            enum_class = build(style, count)
+            elapsed = time.time() - start
+            assert len(enum_class) == count
+            print('%-12s %10d %12.4f %14.2f' % (style, count, elapsed, elapsed / count * 1e6))
+        print()
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,58 @@
+"""
+Enum.__members__ against the stdlib enum.
+
+run from the repository root:
+
+    python -m benchmarks.enum_members [loops]
+
+Results are in microseconds per access of __members__ for enums of 3, 100
+and 2000 members.  aenum returns the read-only view it built with the class;
+the stdlib wraps its mapping in a new MappingProxyType on each access, and
+aenum with _members_copy_ = True copies the mapping each time.
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+import aenum
+
+try:
+    import enum as stdlib_enum
+    stdlib_enum.Enum
+except (ImportError, AttributeError):
+    stdlib_enum = None
+
+
+SIZES = (3, 100, 2000)
+
+
+def enum_classes(size):
+    names = ['M%d' % i for i in range(size)]
+    classes = [('aenum', aenum.Enum('Big', names))]
+    class CopyEnum(aenum.Enum):
+        _members_copy_ = True
+    classes.append(('aenum copy', CopyEnum('Big', names)))
+    if stdlib_enum is not None:
+        classes.append(('stdlib', stdlib_enum.Enum('Big', names)))
+    return classes
+
+
+def main(loops=10000):
+    print('%-12s' % 'class' + ''.join(['%10d' % size for size in SIZES]))
+    results = {}
+    labels = []
+    for size in SIZES:
+        for label, Big in enum_classes(size):
+            if label not in results:
+                labels.append(label)
+                results[label] = []
+            namespace = {'Big': Big}
+            elapsed = min(timeit.repeat('Big.__members__', globals=namespace, number=loops, repeat=5))
+            results[label].append(elapsed / loops * 1e6)
+    for label in labels:
+        print('%-12s' % label + ''.join(['%10.2f' % t for t in results[label]]))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,52 @@
+"""
+Flag |, & and ^ against the stdlib enum.Flag.
+
+run from the repository root:
+
+    python -m benchmarks.flag_operators [loops]
+
+Results are in microseconds per operation; the operands are members of the
+same class and every result is already known (the common case once an
+application has warmed up).
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+import aenum
+
+try:
+    import enum as stdlib_enum
+    stdlib_enum.Flag
+except (ImportError, AttributeError):
+    stdlib_enum = None
+
+
+def flag_classes():
+    classes = []
+    for label, module in (('aenum', aenum), ('stdlib', stdlib_enum)):
+        if module is None:
+            continue
+        for base in (module.Flag, module.IntFlag):
+            Perm = base('Perm', [('R', 4), ('W', 2), ('X', 1)])
+            # create the composite members up front
+            for value in range(8):
+                Perm(value)
+            classes.append(('%s.%s' % (label, base.__name__), Perm))
+    return classes
+
+
+def main(loops=200000):
+    print('%-16s %8s %8s %8s' % ('class', '|', '&', '^'))
+    for label, Perm in flag_classes():
+        namespace = {'r': Perm.R, 'w': Perm.W, 'rw': Perm.R | Perm.W}
+        timings = []
+        for statement in ('r | w', 'rw & w', 'rw ^ w'):
+            elapsed = min(timeit.repeat(statement, globals=namespace, number=loops, repeat=3))
+            timings.append(elapsed / loops * 1e6)
+        print('%-16s %8.3f %8.3f %8.3f' % ((label, ) + tuple(timings)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,51 @@
+"""
+member.value and member.name against the stdlib enum.
+
+run from the repository root:
+
+    python -m benchmarks.member_attributes [loops]
+
+Results are in nanoseconds per attribute read.  aenum's name and value are
+builtin properties around an attrgetter, so no Python code runs; the stdlib
+reads them through enum.property.__get__ (3.11+) or DynamicClassAttribute.
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+import aenum
+
+try:
+    import enum as stdlib_enum
+    stdlib_enum.Enum
+except (ImportError, AttributeError):
+    stdlib_enum = None
+
+
+def member_classes():
+    classes = []
+    for label, module in (('aenum', aenum), ('stdlib', stdlib_enum)):
+        if module is None:
+            continue
+        for base in (module.Enum, module.IntEnum, getattr(module, 'Flag', None)):
+            if base is None:
+                continue
+            Color = base('Color', [('RED', 1), ('GREEN', 2), ('BLUE', 4)])
+            classes.append(('%s.%s' % (label, base.__name__), Color))
+    return classes
+
+
+def main(loops=1000000):
+    print('%-16s %8s %8s' % ('class', 'value', 'name'))
+    for label, Color in member_classes():
+        namespace = {'member': Color.GREEN}
+        timings = []
+        for statement in ('member.value', 'member.name'):
+            elapsed = min(timeit.repeat(statement, globals=namespace, number=loops, repeat=5))
+            timings.append(elapsed / loops * 1e9)
+        print('%-16s %8.1f %8.1f' % ((label, ) + tuple(timings)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
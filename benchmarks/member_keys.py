@@ -0,0 +1,63 @@
+"""
+Members as dict and set keys, against the stdlib enum.
+
+run from the repository root:
+
+    python -m benchmarks.member_keys [loops]
+
+Each workload runs over a list of 1000 members of a 16-member Enum; results
+are in microseconds per workload.  aenum members return a hash cached when
+they were created, and compare by identity before anything else; the
+stdlib hashes the member's name on every call.
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+import aenum
+
+try:
+    import enum as stdlib_enum
+    stdlib_enum.Enum
+except (ImportError, AttributeError):
+    stdlib_enum = None
+
+
+WORKLOADS = (
+        ('lookup', 'for m in stream: table[m]'),
+        ('count', 'for m in stream: counts[m] += 1'),
+        ('in set', 'for m in stream: m in wanted'),
+        ('build', 'dict.fromkeys(stream)'),
+        ('==', 'for m in stream: m == first'),
+        )
+
+
+def main(loops=200):
+    modules = [('aenum', aenum)]
+    if stdlib_enum is not None:
+        modules.append(('stdlib', stdlib_enum))
+    print('%-8s' % 'workload' + ''.join(['%10s' % label for label, _ in modules]))
+    results = []
+    for label, module in modules:
+        Color = module.Enum('Color', ['C%d' % i for i in range(16)])
+        members = list(Color)
+        stream = [members[(i * 7) % 16] for i in range(1000)]
+        namespace = {
+                'stream': stream,
+                'table': dict((m, m.value) for m in members),
+                'counts': dict.fromkeys(members, 0),
+                'wanted': set(members[::3]),
+                'first': members[0],
+                }
+        timings = []
+        for _, statement in WORKLOADS:
+            elapsed = min(timeit.repeat(statement, globals=namespace, number=loops, repeat=5))
+            timings.append(elapsed / loops * 1e6)
+        results.append(timings)
+    for index, (name, _) in enumerate(WORKLOADS):
+        print('%-8s' % name + ''.join(['%10.1f' % timings[index] for timings in results]))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,47 @@
+"""
+NamedTuple field access against collections.namedtuple.
+
+run from the repository root:
+
+    python -m benchmarks.namedtuple_access [loops]
+
+Results are in nanoseconds per attribute read; fixed-size fields should be
+close to collections.namedtuple, variable-size fields still check the length.
+"""
+from __future__ import print_function
+
+import collections
+import sys
+import timeit
+
+from aenum import NamedTuple, TupleSize
+
+
+class Fixed(NamedTuple):
+    x = 0
+    y = 1
+    z = 2
+
+class Variable(NamedTuple):
+    _size_ = TupleSize.variable
+    x = 0
+    y = 1
+    z = 2
+
+Stdlib = collections.namedtuple('Stdlib', 'x y z')
+
+
+def main(loops=1000000):
+    print('%-24s %8s' % ('class', 'ns'))
+    for label, cls in (
+            ('collections.namedtuple', Stdlib),
+            ('NamedTuple (fixed)', Fixed),
+            ('NamedTuple (variable)', Variable),
+        ):
+        namespace = {'point': cls(1, 2, 3)}
+        elapsed = min(timeit.repeat('point.z', globals=namespace, number=loops, repeat=5))
+        print('%-24s %8.1f' % (label, elapsed / loops * 1e9))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])